@@ -9,34 +9,65 @@ Outputs:
   data/processed/plots/01_wholesale_validation.png
 """
 
-import pandas as pd
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # headless: select the file backend before pyplot loads
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
-PLOT_DIR = os.path.join(PROCESSED_DIR, "plots")
+from _data import is_fresh, load_processed
+from _kernels import rolling_mean
+
+SCRIPT = Path(__file__).resolve()
+BASE_DIR = SCRIPT.parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+PLOT_DIR = PROCESSED_DIR / "plots"
+
+# Simplify dense lines aggressively and render long paths in chunks
+matplotlib.rcParams.update({
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize": 10000,
+})
+
+FILES = {
+    "spread": "daily_wholesale_spread.csv",
+    "generation": "daily_wind_solar_generation.csv",
+    "bess": "bess_capacity_monthly.csv",
+    "renewables": "renewable_capacity_monthly.csv",
+    "ancillary": "ancillary_daily_prices.csv",
+    "elexon_wholesale": "daily_elexon_wholesale.csv",
+}
+
+
+def input_paths(names):
+    """Source CSVs for the given dataset names, plus this script."""
+    return [PROCESSED_DIR / FILES[n] for n in names] + [SCRIPT]
 
 
 def load_datasets():
     """Load all processed CSVs, returning what's available."""
     datasets = {}
 
-    files = {
-        "spread": "daily_wholesale_spread.csv",
-        "generation": "daily_wind_solar_generation.csv",
-        "bess": "bess_capacity_monthly.csv",
-        "renewables": "renewable_capacity_monthly.csv",
-        "ancillary": "ancillary_daily_prices.csv",
-        "elexon_wholesale": "daily_elexon_wholesale.csv",
-    }
-
-    for name, filename in files.items():
-        path = os.path.join(PROCESSED_DIR, filename)
-        if os.path.exists(path):
-            df = pd.read_csv(path, parse_dates=["date"])
+    # The files are independent and pyarrow parses with the GIL released, so
+    # read them concurrently; results are still reported in FILES order
+    paths = {name: PROCESSED_DIR / filename for name, filename in FILES.items()}
+    with ThreadPoolExecutor(max_workers=min(len(FILES), os.cpu_count() or 1)) as ex:
+        # The overview only plots and prints summaries, so float32 copies do
+        futures = {name: ex.submit(load_processed, path, downcast=True)
+                   for name, path in paths.items() if path.exists()}
+
+    for name, filename in FILES.items():
+        if name in futures:
+            df = futures[name].result()
+            # Sort once here so the plotting and validation steps never re-sort
+            df.sort_values("date", inplace=True, kind="stable", ignore_index=True)
+            assert df["date"].is_monotonic_increasing
             datasets[name] = df
             print(f"  Loaded {name}: {len(df)} rows, "
                   f"{df['date'].min().date()} to {df['date'].max().date()}")
@@ -46,14 +77,20 @@ def load_datasets():
     return datasets
 
 
-def plot_all_timeseries(datasets):
+def plot_all_timeseries(datasets, force=False):
     """Plot all time series on a shared x-axis."""
-    n_plots = sum(1 for k in ["spread", "generation", "bess", "renewables", "ancillary"]
-                  if k in datasets)
+    panels = [k for k in ["spread", "generation", "bess", "renewables", "ancillary"]
+              if k in datasets]
+    n_plots = len(panels)
     if n_plots == 0:
         print("No data to plot!")
         return
 
+    path = PLOT_DIR / "01_all_timeseries.png"
+    if not force and is_fresh(path, input_paths(panels)):
+        print(f"\nPlot fresh, skipping: {path}")
+        return
+
     fig, axes = plt.subplots(n_plots, 1, figsize=(14, 4 * n_plots), sharex=True)
     if n_plots == 1:
         axes = [axes]
@@ -64,11 +101,14 @@ def plot_all_timeseries(datasets):
     if "spread" in datasets:
         ax = axes[ax_idx]
         df = datasets["spread"]
-        # Plot monthly rolling average for clarity
-        df = df.set_index("date").sort_index()
-        ax.plot(df.index, df["spread_max_min"], alpha=0.15, color="steelblue", linewidth=0.5)
-        monthly = df["spread_max_min"].rolling(30, min_periods=7).mean()
-        ax.plot(monthly.index, monthly, color="steelblue", linewidth=2, label="30-day avg")
+        # Plot monthly rolling average for clarity. Frames are already date
+        # sorted, so each panel plots plain arrays with no re-indexing.
+        dates = df["date"].to_numpy()
+        spread = df["spread_max_min"].to_numpy()
+        ax.plot(dates, spread, alpha=0.15, color="steelblue", linewidth=0.5,
+                rasterized=True)
+        monthly = rolling_mean(spread, 30, 7)
+        ax.plot(dates, monthly, color="steelblue", linewidth=2, label="30-day avg")
         ax.set_ylabel("Spread (£/MWh)")
         ax.set_title("Daily Wholesale Spread (max - min, from Agile tariff)")
         ax.legend()
@@ -78,11 +118,12 @@ def plot_all_timeseries(datasets):
     # 2. Wind and solar generation
     if "generation" in datasets:
         ax = axes[ax_idx]
-        df = datasets["generation"].set_index("date").sort_index()
-        wind_ma = df["wind_gen_gw"].rolling(30, min_periods=7).mean()
-        solar_ma = df["solar_gen_gw"].rolling(30, min_periods=7).mean()
-        ax.plot(wind_ma.index, wind_ma, color="teal", linewidth=2, label="Wind (30d avg)")
-        ax.plot(solar_ma.index, solar_ma, color="orange", linewidth=2, label="Solar (30d avg)")
+        df = datasets["generation"]
+        dates = df["date"].to_numpy()
+        wind_ma = rolling_mean(df["wind_gen_gw"].to_numpy(), 30, 7)
+        solar_ma = rolling_mean(df["solar_gen_gw"].to_numpy(), 30, 7)
+        ax.plot(dates, wind_ma, color="teal", linewidth=2, label="Wind (30d avg)")
+        ax.plot(dates, solar_ma, color="orange", linewidth=2, label="Solar (30d avg)")
         ax.set_ylabel("Generation (GW)")
         ax.set_title("Daily Wind & Solar Generation (Elexon)")
         ax.legend()
@@ -123,10 +164,11 @@ def plot_all_timeseries(datasets):
     if "ancillary" in datasets:
         ax = axes[ax_idx]
         df = datasets["ancillary"]
-        for service in df["service"].unique():
-            sdf = df[df["service"] == service].set_index("date").sort_index()
-            ma = sdf["clearing_price_mw_h"].rolling(7, min_periods=1).mean()
-            ax.plot(ma.index, ma, linewidth=1.5, label=service)
+        # One sort across all services, then a streaming mean per group
+        df = df.sort_values(["service", "date"])
+        for service, sdf in df.groupby("service", sort=False, observed=True):
+            ma = rolling_mean(sdf["clearing_price_mw_h"].to_numpy(), 7, 1)
+            ax.plot(sdf["date"].to_numpy(), ma, linewidth=1.5, label=service)
         ax.set_ylabel("Price (£/MW/h)")
         ax.set_title("Ancillary Market Clearing Prices")
         ax.legend()
@@ -137,51 +179,65 @@ def plot_all_timeseries(datasets):
     axes[-1].xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
 
     plt.tight_layout()
-    path = os.path.join(PLOT_DIR, "01_all_timeseries.png")
     plt.savefig(path, dpi=150, bbox_inches="tight")
     print(f"\nSaved: {path}")
     plt.close()
 
 
-def validate_wholesale(datasets):
+def validate_wholesale(datasets, force=False):
     """Compare Agile-derived wholesale prices against Elexon market index."""
     if "spread" not in datasets or "elexon_wholesale" not in datasets:
         print("\nSkipping wholesale validation — need both Agile spread and Elexon wholesale")
         return
 
-    agile = datasets["spread"][["date", "price_mean", "spread_max_min"]].copy()
-    agile.columns = ["date", "agile_mean_mwh", "agile_spread"]
-    elexon = datasets["elexon_wholesale"][["date", "wholesale_mean", "wholesale_spread"]].copy()
+    agile = datasets["spread"].set_index("date")[["price_mean", "spread_max_min"]]
+    elexon = datasets["elexon_wholesale"].set_index("date")[["wholesale_mean", "wholesale_spread"]]
 
-    merged = pd.merge(agile, elexon, on="date", how="inner")
-    if merged.empty:
+    common_idx = agile.index.intersection(elexon.index)
+    if common_idx.empty:
         print("\nNo overlapping dates for wholesale validation")
         return
 
     print(f"\n--- Wholesale Validation ---")
-    print(f"Overlapping days: {len(merged)}")
+    print(f"Overlapping days: {len(common_idx)}")
+
+    # Columns: Agile mean, Agile spread, Elexon mean, Elexon spread.
+    # Aligned once, then both correlations and both ratios come from a single
+    # corrcoef and a single column-mean pass over the complete rows.
+    values = np.column_stack([
+        agile.reindex(common_idx).to_numpy(),
+        elexon.reindex(common_idx).to_numpy(),
+    ])
+    values = values[np.isfinite(values).all(axis=1)]
+    corr = np.corrcoef(values, rowvar=False)
+    means = values.mean(axis=0)
 
     # Correlation between price levels
-    corr_price = merged["agile_mean_mwh"].corr(merged["wholesale_mean"])
+    corr_price = corr[0, 2]
     print(f"Price level correlation (Agile vs Elexon): {corr_price:.3f}")
 
     # Correlation between spreads
-    corr_spread = merged["agile_spread"].corr(merged["wholesale_spread"])
+    corr_spread = corr[1, 3]
     print(f"Spread correlation (Agile vs Elexon): {corr_spread:.3f}")
 
     # Ratio (the Agile multiplier)
-    ratio = merged["agile_mean_mwh"].mean() / merged["wholesale_mean"].mean()
+    ratio = means[0] / means[2]
     print(f"Mean price ratio (Agile/Elexon): {ratio:.2f}")
 
-    spread_ratio = merged["agile_spread"].mean() / merged["wholesale_spread"].mean()
+    spread_ratio = means[1] / means[3]
     print(f"Mean spread ratio (Agile/Elexon): {spread_ratio:.2f}")
 
     # Plot
+    path = PLOT_DIR / "01_wholesale_validation.png"
+    if not force and is_fresh(path, input_paths(["spread", "elexon_wholesale"])):
+        print(f"Plot fresh, skipping: {path}")
+        return
+
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
 
     ax = axes[0]
-    ax.scatter(merged["wholesale_mean"], merged["agile_mean_mwh"],
-               alpha=0.3, s=5, color="steelblue")
+    ax.scatter(values[:, 2], values[:, 0],
+               alpha=0.3, s=5, color="steelblue", rasterized=True)
     ax.set_xlabel("Elexon wholesale mean (£/MWh)")
     ax.set_ylabel("Agile-derived mean (£/MWh)")
     ax.set_title(f"Price level comparison (r={corr_price:.2f})")
@@ -193,8 +249,8 @@ def validate_wholesale(datasets):
     ax.grid(True, alpha=0.3)
 
     ax = axes[1]
-    ax.scatter(merged["wholesale_spread"], merged["agile_spread"],
-               alpha=0.3, s=5, color="coral")
+    ax.scatter(values[:, 3], values[:, 1],
+               alpha=0.3, s=5, color="coral", rasterized=True)
     ax.set_xlabel("Elexon wholesale spread (£/MWh)")
     ax.set_ylabel("Agile-derived spread (£/MWh)")
     ax.set_title(f"Spread comparison (r={corr_spread:.2f})")
@@ -205,7 +261,6 @@ def validate_wholesale(datasets):
     ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    path = os.path.join(PLOT_DIR, "01_wholesale_validation.png")
     plt.savefig(path, dpi=150, bbox_inches="tight")
     print(f"Saved: {path}")
     plt.close()
@@ -221,7 +276,9 @@ def print_data_quality(datasets):
         print(f"\n{name}:")
         print(f"  Rows: {len(df)}")
         print(f"  Date range: {df['date'].min().date()} to {df['date'].max().date()}")
-        nulls = df.isnull().sum()
+        # count() reduces each column to its non-null total without
+        # materialising a frame-sized boolean mask like isnull().sum() does
+        nulls = len(df) - df.count()
         if nulls.any():
             print(f"  Missing values:")
             for col, n in nulls[nulls > 0].items():
@@ -230,8 +287,8 @@ def print_data_quality(datasets):
             print(f"  No missing values")
 
 
-def main():
-    os.makedirs(PLOT_DIR, exist_ok=True)
+def main(force=False):
+    PLOT_DIR.mkdir(parents=True, exist_ok=True)
 
     print("=" * 60)
     print("DATA OVERVIEW & EXPLORATORY ANALYSIS")
@@ -245,8 +302,8 @@ def main():
         sys.exit(1)
 
     print_data_quality(datasets)
-    plot_all_timeseries(datasets)
-    validate_wholesale(datasets)
+    plot_all_timeseries(datasets, force=force)
+    validate_wholesale(datasets, force=force)
 
     print(f"\n{'=' * 60}")
     print("OVERVIEW COMPLETE")
@@ -254,4 +311,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Data overview and exploratory analysis")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render plots even if they are newer than their inputs")
+    main(force=parser.parse_args().force)
@@ -17,71 +17,41 @@ Outputs:
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless: select the file backend before pyplot loads
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import numpy as np
-import os
+import argparse
+from pathlib import Path
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
-PLOT_DIR = os.path.join(PROCESSED_DIR, "plots")
+from _data import is_fresh, load_processed
 
+SCRIPT = Path(__file__).resolve()
+BASE_DIR = SCRIPT.parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+PLOT_DIR = PROCESSED_DIR / "plots"
 
-def main():
-    os.makedirs(PLOT_DIR, exist_ok=True)
+# Simplify dense lines aggressively and render long paths in chunks
+matplotlib.rcParams.update({
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize": 10000,
+})
 
-    print("=" * 60)
-    print("COMPONENT 1: BESS CAPACITY FORECAST")
-    print("=" * 60)
-
-    # Load data
-    bess_path = os.path.join(PROCESSED_DIR, "bess_capacity_monthly.csv")
-    scenarios_path = os.path.join(PROCESSED_DIR, "bess_fes_scenarios.csv")
-
-    bess = pd.read_csv(bess_path, parse_dates=["date"])
-    print(f"Loaded BESS capacity: {len(bess)} months")
-
-    scenarios = None
-    if os.path.exists(scenarios_path):
-        scenarios = pd.read_csv(scenarios_path, parse_dates=["date"])
-        print(f"Loaded FES scenarios: {len(scenarios)} rows")
-
-    # Split historic vs projected
-    historic = bess[bess["source"] == "historic"].copy()
-    projected = bess[bess["source"] != "historic"].copy()
-
-    print(f"\nHistoric: {historic['date'].min().date()} to {historic['date'].max().date()}")
-    print(f"  Start: {historic['bess_capacity_gw'].iloc[0]:.1f} GW")
-    print(f"  End: {historic['bess_capacity_gw'].iloc[-1]:.1f} GW")
-
-    if not projected.empty:
-        print(f"\nProjected: {projected['date'].min().date()} to {projected['date'].max().date()}")
-        print(f"  End: {projected['bess_capacity_gw'].iloc[-1]:.1f} GW")
 
-    # Build the forecast: Jan 2026 to Dec 2030
-    forecast_start = pd.Timestamp("2026-01-01")
-    forecast_end = pd.Timestamp("2030-12-01")
-
-    forecast = bess[
-        (bess["date"] >= forecast_start) & (bess["date"] <= forecast_end)
-    ].copy()
-
-    if forecast.empty and scenarios is not None:
-        # Use system_transformation scenario
-        st = scenarios[scenarios["scenario"] == "system_transformation"]
-        forecast = st[
-            (st["date"] >= forecast_start) & (st["date"] <= forecast_end)
-        ][["date", "bess_capacity_gw"]].copy()
+def date_window(df, start, end):
+    """Rows of a date-sorted frame with start <= date <= end, as a positional slice."""
+    dates = df["date"].to_numpy()
+    lo = np.searchsorted(dates, start.to_datetime64(), side="left")
+    hi = np.searchsorted(dates, end.to_datetime64(), side="right")
+    return df.iloc[lo:hi]
 
-    print(f"\nForecast period: {forecast['date'].min().date()} to {forecast['date'].max().date()}")
-    print(f"  Months: {len(forecast)}")
 
-    # Save forecast
-    forecast_path = os.path.join(PROCESSED_DIR, "bess_forecast.csv")
-    forecast.to_csv(forecast_path, index=False)
-    print(f"Saved: {forecast_path}")
-
-    # --- Plot ---
+def plot_forecast(historic, scenarios, forecast_start, path):
+    """Plot historic capacity with the FES scenario fan and save to `path`."""
     fig, ax = plt.subplots(figsize=(14, 6))
 
     # Historic
@@ -103,20 +73,31 @@ def main():
             "falling_short": "Falling Short",
         }
 
-        for scenario_name in ["falling_short", "system_transformation",
-                              "consumer_transformation", "leading_the_way"]:
+        # All scenario lines go into one LineCollection (a single draw call);
+        # legend entries use proxy handles since the collection has one label
+        order = ["falling_short", "system_transformation",
+                 "consumer_transformation", "leading_the_way"]
+        segs = []
+        for scenario_name in order:
             sdf = scenarios[scenarios["scenario"] == scenario_name]
-            ax.plot(sdf["date"], sdf["bess_capacity_gw"],
-                    color=scenario_colors[scenario_name],
-                    linewidth=1.5, linestyle="--",
-                    label=scenario_labels[scenario_name])
-
-        # Fill between LW and FS for uncertainty band
-        lw = scenarios[scenarios["scenario"] == "leading_the_way"].set_index("date")
-        fs = scenarios[scenarios["scenario"] == "falling_short"].set_index("date")
-        common = lw.index.intersection(fs.index)
-        ax.fill_between(common, fs.loc[common, "bess_capacity_gw"],
-                        lw.loc[common, "bess_capacity_gw"],
+            segs.append(np.column_stack([mdates.date2num(sdf["date"]),
+                                         sdf["bess_capacity_gw"].to_numpy()]))
+        ax.add_collection(LineCollection(
+            segs, colors=[scenario_colors[s] for s in order],
+            linewidths=1.5, linestyles="--",
+        ))
+        ax.autoscale_view()
+        for scenario_name in order:
+            ax.add_line(Line2D([], [], color=scenario_colors[scenario_name],
+                               linewidth=1.5, linestyle="--",
+                               label=scenario_labels[scenario_name]))
+
+        # Fill between LW and FS for uncertainty band; one pivot aligns both
+        # scenarios on date, dropna keeps only months present in each
+        band = scenarios.pivot_table(
+            index="date", columns="scenario", values="bess_capacity_gw", observed=True,
+        )[["leading_the_way", "falling_short"]].dropna()
+        ax.fill_between(band.index, band["falling_short"], band["leading_the_way"],
                         alpha=0.1, color="purple")
 
     # Vertical line at forecast start
@@ -133,21 +114,90 @@ def main():
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
 
     plt.tight_layout()
-    path = os.path.join(PLOT_DIR, "02_bess_forecast.png")
     plt.savefig(path, dpi=150, bbox_inches="tight")
     print(f"\nSaved plot: {path}")
     plt.close()
 
+
+def main(force=False):
+    PLOT_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("COMPONENT 1: BESS CAPACITY FORECAST")
+    print("=" * 60)
+
+    # Load data
+    bess_path = PROCESSED_DIR / "bess_capacity_monthly.csv"
+    scenarios_path = PROCESSED_DIR / "bess_fes_scenarios.csv"
+
+    bess = load_processed(bess_path)
+    bess.sort_values("date", inplace=True, kind="stable", ignore_index=True)
+    print(f"Loaded BESS capacity: {len(bess)} months")
+
+    scenarios = None
+    if scenarios_path.exists():
+        scenarios = load_processed(scenarios_path)
+        scenarios.sort_values("date", inplace=True, kind="stable", ignore_index=True)
+        print(f"Loaded FES scenarios: {len(scenarios)} rows")
+
+    # Split historic vs projected on the category codes (source is categorical)
+    source = bess["source"].cat
+    is_historic = source.codes.to_numpy() == source.categories.get_loc("historic")
+    historic = bess.iloc[is_historic]
+    projected = bess.iloc[~is_historic]
+
+    print(f"\nHistoric: {historic['date'].min().date()} to {historic['date'].max().date()}")
+    print(f"  Start: {historic['bess_capacity_gw'].iloc[0]:.1f} GW")
+    print(f"  End: {historic['bess_capacity_gw'].iloc[-1]:.1f} GW")
+
+    if not projected.empty:
+        print(f"\nProjected: {projected['date'].min().date()} to {projected['date'].max().date()}")
+        print(f"  End: {projected['bess_capacity_gw'].iloc[-1]:.1f} GW")
+
+    # Build the forecast: Jan 2026 to Dec 2030
+    forecast_start = pd.Timestamp("2026-01-01")
+    forecast_end = pd.Timestamp("2030-12-01")
+
+    forecast = date_window(bess, forecast_start, forecast_end)
+
+    if forecast.empty and scenarios is not None:
+        # Use system_transformation scenario
+        st = scenarios[scenarios["scenario"] == "system_transformation"]
+        forecast = date_window(st, forecast_start, forecast_end)[["date", "bess_capacity_gw"]]
+
+    print(f"\nForecast period: {forecast['date'].min().date()} to {forecast['date'].max().date()}")
+    print(f"  Months: {len(forecast)}")
+
+    # Save forecast
+    forecast_path = PROCESSED_DIR / "bess_forecast.csv"
+    forecast.to_csv(forecast_path, index=False)
+    print(f"Saved: {forecast_path}")
+
+    # --- Plot ---
+    path = PLOT_DIR / "02_bess_forecast.png"
+    inputs = [bess_path, SCRIPT]
+    if scenarios is not None:
+        inputs.append(scenarios_path)
+    if not force and is_fresh(path, inputs):
+        print(f"\nPlot fresh, skipping: {path}")
+    else:
+        plot_forecast(historic, scenarios, forecast_start, path)
+
     # Print forecast summary
     print(f"\n{'=' * 60}")
     print("BESS FORECAST SUMMARY (System Transformation base case)")
     print(f"{'=' * 60}")
-    for year in range(2026, 2031):
-        year_data = forecast[forecast["date"].dt.year == year]
-        if not year_data.empty:
-            mid = year_data["bess_capacity_gw"].iloc[len(year_data) // 2]
-            print(f"  {year}: ~{mid:.1f} GW")
+    # Mid-year value per forecast year, in one grouping pass
+    years = forecast["date"].to_numpy().astype("datetime64[Y]").astype(int) + 1970
+    mids = (pd.Series(forecast["bess_capacity_gw"].to_numpy())
+            .groupby(years)
+            .apply(lambda s: s.iloc[len(s) // 2]))
+    for year, mid in mids.items():
+        print(f"  {year}: ~{mid:.1f} GW")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="BESS capacity forecast")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render the plot even if it is newer than its inputs")
+    main(force=parser.parse_args().force)
@@ -38,14 +38,35 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import statsmodels.api as sm
+from scipy import stats
+from scipy.linalg import lstsq
 from scipy.optimize import curve_fit
-import json
+from collections import namedtuple
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import os
 
+from _data import load_processed, write_json
+from _plotting import save_fast
+from _kernels import power_law, rolling_mean
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 PLOT_DIR = os.path.join(PROCESSED_DIR, "plots")
 
+# Aggregate months across processes (see monthly_means)
+PARALLEL_GROUPBY = False
+GROUPBY_CHUNK_MONTHS = 100
+
+# Capacity grid (GW) the fitted curves are drawn over
+_BESS_GRID = np.linspace(0.5, 25, 200)
+_BESS_GRID.setflags(write=False)
+
+
+def month_start(dates):
+    """First day of each date's month, at the same resolution as `dates`."""
+    return dates.to_numpy().astype("datetime64[M]").astype(dates.dtype)
+
 
 def load_and_merge():
     """Load and merge all datasets for the spread model."""
@@ -53,39 +74,52 @@ def load_and_merge():
     agile_path = os.path.join(PROCESSED_DIR, "daily_wholesale_spread.csv")
 
     if os.path.exists(elexon_path):
-        spread = pd.read_csv(elexon_path, parse_dates=["date"])
         spread_col = "wholesale_spread"
         price_col = "wholesale_mean"
+        spread = load_processed(elexon_path, columns=["date", spread_col, price_col])
         print(f"Using Elexon wholesale spread (direct market data)")
     else:
-        spread = pd.read_csv(agile_path, parse_dates=["date"])
         spread_col = "spread_max_min"
         price_col = "price_mean"
+        spread = load_processed(agile_path, columns=["date", spread_col, price_col])
         print(f"Using Agile-derived spread (Elexon not available)")
 
     # BESS capacity (monthly step function)
-    bess = pd.read_csv(
-        os.path.join(PROCESSED_DIR, "bess_capacity_monthly.csv"),
-        parse_dates=["date"]
-    )
-    bess["year_month"] = bess["date"].dt.to_period("M")
-    bess_lookup = bess[bess["source"] == "historic"].set_index("year_month")["bess_capacity_gw"]
-
-    spread["year_month"] = spread["date"].dt.to_period("M")
-    spread["bess_gw"] = spread["year_month"].map(bess_lookup)
+    bess = load_processed(os.path.join(PROCESSED_DIR, "bess_capacity_monthly.csv"),
+                          columns=["date", "bess_capacity_gw", "source"])
+    hist = bess[bess["source"] == "historic"]
+    bess_lookup = pd.DataFrame({
+        "year_month": month_start(hist["date"]),
+        "bess_gw": hist["bess_capacity_gw"].to_numpy(),
+    }).sort_values("year_month")
+
+    # Join each day to its month's capacity with one sorted as-of join.
+    # tolerance=0 keeps it an exact month match, so days outside the
+    # historic months get NaN rather than the last known capacity.
+    spread = spread.sort_values("date", ignore_index=True)
+    spread["year_month"] = month_start(spread["date"])
+    spread = pd.merge_asof(spread, bess_lookup, on="year_month",
+                           direction="backward", tolerance=pd.Timedelta(0))
 
     # Wind generation
     gen_path = os.path.join(PROCESSED_DIR, "daily_wind_solar_generation.csv")
     if os.path.exists(gen_path):
-        gen = pd.read_csv(gen_path, parse_dates=["date"])
-        spread = pd.merge(spread, gen[["date", "wind_gen_gw"]], on="date", how="left")
+        gen = load_processed(gen_path, columns=["date", "wind_gen_gw"])
+        spread = pd.merge(spread, gen, on="date", how="left")
     else:
         spread["wind_gen_gw"] = np.nan
 
-    spread = spread.dropna(subset=["bess_gw"]).copy()
-    spread["month"] = spread["date"].dt.month
-    spread["year"] = spread["date"].dt.year
-    spread["day_of_week"] = spread["date"].dt.dayofweek
+    spread = spread.dropna(subset=["bess_gw"])
+    # Calendar fields straight from the datetime64 buffer, in narrow ints.
+    # 1970-01-01 was a Thursday, so Monday=0 is (days since epoch + 3) % 7.
+    # One assign adds all three without a defensive copy of the frame.
+    days = spread["date"].to_numpy().astype("datetime64[D]")
+    months = days.astype("datetime64[M]").astype(np.int64)
+    spread = spread.assign(
+        month=(months % 12 + 1).astype(np.int8),
+        year=(months // 12 + 1970).astype(np.int16),
+        day_of_week=((days.astype(np.int64) + 3) % 7).astype(np.int8),
+    )
 
     print(f"Merged dataset: {len(spread)} days")
     print(f"Date range: {spread['date'].min().date()} to {spread['date'].max().date()}")
@@ -94,12 +128,82 @@ def load_and_merge():
     return spread, spread_col, price_col
 
 
-def run_ols(df, spread_col, include_year_dummies=True):
-    """Run OLS regression (for diagnostics and comparison)."""
-    label = "(with year dummies)" if include_year_dummies else "(no year dummies)"
-    print(f"\n--- OLS: {spread_col} {label} ---")
+# The handful of statsmodels results attributes the script relies on
+# plus the design (exog/endog) so related coefficients can be derived without refitting
+OLSResult = namedtuple("OLSResult", ["params", "bse", "pvalues", "rsquared", "nobs", "resid",
+                                     "exog", "endog", "exog_names"])
+
+
+def fit_ols_hc1(X, y, names, index):
+    """
+    OLS with heteroskedasticity-robust (HC1) standard errors.
+
+    Solves the least-squares problem with LAPACK gelsd and builds the HC1
+    sandwich (X'X)^-1 X' diag(e^2) X (X'X)^-1 * n/(n-k) directly. p-values use
+    the normal distribution, as statsmodels does for robust covariances.
+
+    Everything runs in float64: bess_gw is close to collinear with the year
+    dummies, so a lower-precision solve moves the persisted coefficients.
+    """
+    n, k = X.shape
+    coef, *_ = lstsq(X, y, lapack_driver="gelsd")
+    resid = y - X @ coef
+
+    xtx_inv = np.linalg.pinv(X.T @ X)
+    meat = (X.T * resid ** 2) @ X
+    cov = xtx_inv @ meat @ xtx_inv * (n / (n - k))
+    se = np.sqrt(np.diag(cov))
+    pvalues = 2 * stats.norm.sf(np.abs(coef / se))
+
+    centered = y - y.mean()
+    rsquared = 1.0 - (resid @ resid) / (centered @ centered)
+
+    return OLSResult(
+        params=pd.Series(coef, index=names),
+        bse=pd.Series(se, index=names),
+        pvalues=pd.Series(pvalues, index=names),
+        rsquared=rsquared,
+        nobs=n,
+        resid=pd.Series(resid, index=index),
+        exog=X,
+        endog=y,
+        exog_names=list(names),
+    )
+
+
+def coef_without_year_dummies(model, feat="bess_gw"):
+    """
+    Coefficient on `feat` had the year dummies been left out, by
+    Frisch-Waugh-Lovell on the fitted design rather than a second full fit.
+
+    The other non-year regressors are partialled out of both `feat` and y in
+    one least-squares solve; the coefficient is the slope of residual on
+    residual. Same rows and controls as the no-year regression, so it is
+    exactly that regression's point estimate. The residuals are that
+    regression's too, so its HC1 standard error and normal p-value come out
+    of the same quantities. Returns (coef, se, pvalue).
+    """
+    names = model.exog_names
+    j = names.index(feat)
+    controls = [i for i, name in enumerate(names) if i != j and not name.startswith("year_")]
+    Z = model.exog[:, controls]
+    targets = np.column_stack([model.exog[:, j], model.endog])
+    coef, *_ = lstsq(Z, targets, lapack_driver="gelsd")
+    b, e = (targets - Z @ coef).T
+    bb = b @ b
+    slope = (b @ e) / bb
+
+    n, k = len(b), len(controls) + 1
+    resid = e - slope * b
+    se = np.sqrt((b ** 2) @ (resid ** 2) * (n / (n - k))) / bb
+    pvalue = 2 * stats.norm.sf(abs(slope / se))
+    return slope, se, pvalue
+
+
+def run_ols(df, spread_col):
+    """Run the OLS regression with month and year dummies (for diagnostics and comparison)."""
+    print(f"\n--- OLS: {spread_col} (with year dummies) ---")
 
-    df = df.copy()
     features = ["bess_gw"]
     feature_labels = ["BESS capacity (GW)"]
 
@@ -107,24 +211,41 @@ def run_ols(df, spread_col, include_year_dummies=True):
         features.append("wind_gen_gw")
         feature_labels.append("Wind generation (GW)")
 
-    df["weekend"] = (df["day_of_week"] >= 5).astype(float)
+    # Dummy levels come from the full frame, dropping the first as baseline
+    month_levels = np.unique(df["month"].to_numpy())[1:]
+    year_levels = np.unique(df["year"].to_numpy())[1:]
+
+    # One ANDed validity mask over the model columns, then a single gather
+    cols = features + [spread_col]
+    mask = ~np.column_stack([df[c].isna().to_numpy() for c in cols]).any(axis=1)
+    model_df = df.loc[mask]
+    n = len(model_df)
+
+    # Fill one preallocated design matrix in place: constant, continuous
+    # features, weekend flag, then month and year one-hot blocks
+    names = (["const"] + features + ["weekend"]
+             + [f"month_{m}" for m in month_levels]
+             + [f"year_{y}" for y in year_levels])
+    X = np.empty((n, len(names)))
+    X[:, 0] = 1.0
+    col = 1
+    for feat in features:
+        X[:, col] = model_df[feat].to_numpy()
+        col += 1
+    X[:, col] = model_df["day_of_week"].to_numpy() >= 5
+    col += 1
+    months = model_df["month"].to_numpy()
+    X[:, col:col + len(month_levels)] = months[:, None] == month_levels[None, :]
+    col += len(month_levels)
+    years = model_df["year"].to_numpy()
+    X[:, col:] = years[:, None] == year_levels[None, :]
+
     features.append("weekend")
     feature_labels.append("Weekend")
 
-    month_dummies = pd.get_dummies(df["month"], prefix="month", drop_first=True).astype(float)
-    year_dummies = pd.DataFrame()
-    if include_year_dummies:
-        year_dummies = pd.get_dummies(df["year"], prefix="year", drop_first=True).astype(float)
-
-    model_df = df.dropna(subset=features + [spread_col]).copy()
-    X = model_df[features].copy()
-    X = pd.concat([X, month_dummies.loc[model_df.index]], axis=1)
-    if not year_dummies.empty:
-        X = pd.concat([X, year_dummies.loc[model_df.index]], axis=1)
-    X = sm.add_constant(X)
-    y = model_df[spread_col]
+    y = model_df[spread_col].to_numpy(dtype=np.float64)
 
-    model = sm.OLS(y, X).fit(cov_type="HC1")
+    model = fit_ols_hc1(X, y, names, model_df.index)
     print(f"Observations: {len(y)}, R²: {model.rsquared:.3f}")
 
     for feat, label in zip(features, feature_labels):
@@ -145,11 +266,56 @@ def power_law_spread(bess_gw, floor, spread_ref, bess_ref, alpha):
 
     As bess_gw grows beyond bess_ref, spread decays toward floor.
     Diminishing returns: each additional GW compresses less.
+
+    bess_gw may be a scalar or an array; arrays go through the compiled
+    kernel in _kernels.
     """
+    if np.ndim(bess_gw) > 0:
+        return power_law(bess_gw, floor, spread_ref, bess_ref, alpha)
     return floor + (spread_ref - floor) * (bess_ref / bess_gw) ** alpha
 
 
-def fit_power_law(df, spread_col):
+def _agg_months(df, spread_col):
+    return df.groupby("year_month", sort=True).agg(
+        date=("date", "first"),
+        bess_gw=("bess_gw", "mean"),
+        spread=pd.NamedAgg(column=spread_col, aggfunc="mean"),
+        wind_gw=("wind_gen_gw", "mean"),
+        n_days=("date", "count"),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _curve(floor, spread_ref, bess_ref, alpha):
+    """Power-law spread over _BESS_GRID, cached per parameter set (read-only)."""
+    curve = power_law_spread(_BESS_GRID, floor, spread_ref, bess_ref, alpha)
+    curve.setflags(write=False)
+    return curve
+
+
+def monthly_means(df, spread_col):
+    """
+    Monthly averages of the daily data, computed once and shared by the
+    power-law fit and the time-series plot.
+
+    With PARALLEL_GROUPBY set, whole months are split into chunks and
+    aggregated in worker processes. Only worth it for long half-hourly
+    histories; at daily resolution the process start-up costs more.
+    """
+    if not PARALLEL_GROUPBY:
+        return _agg_months(df, spread_col).reset_index()
+
+    # df is date-sorted, so each chunk of months is a contiguous row slice
+    keys = df["year_month"].to_numpy()
+    bounds = np.searchsorted(keys, np.unique(keys)[::GROUPBY_CHUNK_MONTHS])
+    bounds = np.append(bounds, len(df))
+    chunks = [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ProcessPoolExecutor() as ex:
+        parts = list(ex.map(_agg_months, chunks, [spread_col] * len(chunks)))
+    return pd.concat(parts).reset_index()
+
+
+def fit_power_law(monthly_all):
     """
     Fit the power-law model to monthly-averaged data.
 
@@ -158,14 +324,8 @@ def fit_power_law(df, spread_col):
     """
     print(f"\n--- Power-law fit: spread = floor + (S0 - floor) * (C0/C)^alpha ---")
 
-    # Monthly averages to reduce daily noise
-    monthly = df.groupby("year_month").agg(
-        bess_gw=("bess_gw", "mean"),
-        spread=pd.NamedAgg(column=spread_col, aggfunc="mean"),
-        wind_gw=("wind_gen_gw", "mean"),
-        n_days=("date", "count"),
-    ).reset_index()
-    monthly = monthly.dropna()
+    # Only complete months (including wind) feed the fit
+    monthly = monthly_all.dropna()
 
     print(f"Monthly observations: {len(monthly)}")
     print(f"BESS range: {monthly['bess_gw'].min():.1f} to {monthly['bess_gw'].max():.1f} GW")
@@ -228,17 +388,18 @@ def calibrate_params(monthly_data, spread_col):
     # Show what this predicts at various capacities
     print(f"\nForecasted spread at different BESS capacities:")
     print(f"  {'BESS (GW)':<12} {'Central':<14} {'Conservative':<14} {'Aggressive'}")
-    for c in [bess_ref, 10, 13, 16, 18, 20, 25]:
-        s_central = power_law_spread(c, floor, spread_ref, bess_ref, alpha_central)
-        s_low = power_law_spread(c, floor, spread_ref, bess_ref, alpha_modo)
-        s_high = power_law_spread(c, floor, spread_ref, bess_ref, alpha_caiso)
+    # One broadcast over capacities x (central, conservative, aggressive) alphas
+    capacities = np.array([bess_ref, 10, 13, 16, 18, 20, 25], dtype=float)
+    alphas = np.array([alpha_central, alpha_modo, alpha_caiso])
+    table = floor + (spread_ref - floor) * (bess_ref / capacities[:, None]) ** alphas[None, :]
+    for c, (s_central, s_low, s_high) in zip(capacities, table):
         marker = " <-- 2025" if abs(c - bess_ref) < 0.5 else ""
         print(f"  {c:<12.0f} £{s_central:<13.1f} £{s_low:<13.1f} £{s_high:.1f}{marker}")
 
     return params
 
 
-def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
+def plot_model(df, monthly, monthly_all, params, spread_col, ols_model, ols_model_df):
     """Plot the power-law fit alongside data and OLS comparison."""
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
@@ -251,14 +412,13 @@ def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
     ax.scatter(monthly["bess_gw"], monthly["spread"],
                s=40, alpha=0.6, color="steelblue", zorder=5, label="Monthly avg (GB)")
 
-    bess_range = np.linspace(0.5, 25, 200)
     for alpha, label, color, ls in [
         (params["alpha"], f'Central (alpha={params["alpha"]})', "coral", "-"),
         (params["alpha_low"], f'Conservative (alpha={params["alpha_low"]})', "coral", "--"),
         (params["alpha_high"], f'Aggressive (alpha={params["alpha_high"]})', "coral", ":"),
     ]:
-        spread_curve = [power_law_spread(c, floor, S0, C0, alpha) for c in bess_range]
-        ax.plot(bess_range, spread_curve, color=color, linewidth=2 if ls == "-" else 1.5,
+        spread_curve = _curve(floor, S0, C0, alpha)
+        ax.plot(_BESS_GRID, spread_curve, color=color, linewidth=2 if ls == "-" else 1.5,
                 linestyle=ls, label=label)
 
     ax.axhline(floor, color="gray", linestyle=":", alpha=0.5,
@@ -271,16 +431,12 @@ def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
 
     # 2. Time series with power-law prediction
     ax = axes[0, 1]
-    monthly_sorted = monthly.sort_values("bess_gw")
-    # Map monthly data to dates for time-series plot
-    df_monthly_ts = df.groupby("year_month").agg(
-        date=("date", "first"),
-        spread=pd.NamedAgg(column=spread_col, aggfunc="mean"),
-        bess_gw=("bess_gw", "mean"),
-    ).reset_index().sort_values("date")
+    # Monthly aggregates are already in date order (grouped on sorted year_month)
+    df_monthly_ts = monthly_all
 
-    predicted = [power_law_spread(c, floor, S0, C0, params["alpha"])
-                 for c in df_monthly_ts["bess_gw"]]
+    bess_arr = df_monthly_ts["bess_gw"].to_numpy()
+    predicted = power_law_spread(bess_arr, floor, S0, C0, params["alpha"])
+    assert predicted.shape == bess_arr.shape
 
     ax.plot(df_monthly_ts["date"], df_monthly_ts["spread"],
             color="steelblue", linewidth=1.5, label="Actual (monthly avg)")
@@ -291,19 +447,22 @@ def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
     ax.legend()
     ax.grid(True, alpha=0.3)
 
-    # 3. Scatter colored by wind (daily data)
+    # 3. Daily data binned into hexagons, coloured by mean wind in each bin
     ax = axes[1, 0]
     if "wind_gen_gw" in df.columns and df["wind_gen_gw"].notna().any():
-        scatter = ax.scatter(df["bess_gw"], df[spread_col],
-                             c=df["wind_gen_gw"], cmap="YlGnBu",
-                             alpha=0.2, s=5, vmin=0, vmax=15)
-        plt.colorbar(scatter, ax=ax, label="Wind gen (GW)")
+        has_wind = df["wind_gen_gw"].notna().to_numpy()
+        hb = ax.hexbin(df["bess_gw"].to_numpy()[has_wind], df[spread_col].to_numpy()[has_wind],
+                       C=df["wind_gen_gw"].to_numpy()[has_wind], reduce_C_function=np.mean,
+                       gridsize=50, cmap="YlGnBu", vmin=0, vmax=15)
+        plt.colorbar(hb, ax=ax, label="Wind gen (GW)")
     else:
-        ax.scatter(df["bess_gw"], df[spread_col], alpha=0.2, s=5, color="steelblue")
+        hb = ax.hexbin(df["bess_gw"], df[spread_col], gridsize=50, cmap="Blues", mincnt=1)
+        plt.colorbar(hb, ax=ax, label="Days")
 
     # Overlay power-law curve
-    spread_curve = [power_law_spread(c, floor, S0, C0, params["alpha"]) for c in bess_range]
-    ax.plot(bess_range, spread_curve, color="coral", linewidth=2.5, zorder=10)
+    # Same parameters as the central curve above, so this is a cache hit
+    spread_curve = _curve(floor, S0, C0, params["alpha"])
+    ax.plot(_BESS_GRID, spread_curve, color="coral", linewidth=2.5, zorder=10)
     ax.set_xlabel("BESS Capacity (GW)")
     ax.set_ylabel("Daily Spread (£/MWh)")
     ax.set_title("Daily Data with Power-Law Fit")
@@ -311,10 +470,11 @@ def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
 
     # 4. OLS residuals for reference
     ax = axes[1, 1]
-    ols_sorted = ols_model_df.sort_values("date")
-    residuals = ols_model.resid.loc[ols_sorted.index]
-    resid_ma = pd.Series(residuals.values, index=ols_sorted["date"]).rolling(30, min_periods=7).mean()
-    ax.plot(resid_ma.index, resid_ma, color="gray", linewidth=1.5)
+    # resid is positionally aligned with ols_model_df, so one argsort orders both
+    order = np.argsort(ols_model_df["date"].to_numpy(), kind="stable")
+    dates_sorted = ols_model_df["date"].to_numpy()[order]
+    resid_ma = rolling_mean(ols_model.resid.to_numpy()[order], 30, 7)
+    ax.plot(dates_sorted, resid_ma, color="gray", linewidth=1.5)
     ax.axhline(0, color="black", linestyle="--", alpha=0.3)
     ax.set_ylabel("Residual (£/MWh)")
     ax.set_title("OLS Residuals (30d rolling mean)")
@@ -322,7 +482,7 @@ def plot_model(df, monthly, params, spread_col, ols_model, ols_model_df):
 
     plt.tight_layout()
     path = os.path.join(PLOT_DIR, "03_spread_model.png")
-    plt.savefig(path, dpi=150, bbox_inches="tight")
+    save_fast(fig, path)
     print(f"\nSaved: {path}")
     plt.close()
 
@@ -343,7 +503,7 @@ def plot_diagnostics(ols_model):
 
     plt.tight_layout()
     path = os.path.join(PLOT_DIR, "03_spread_diagnostics.png")
-    plt.savefig(path, dpi=150, bbox_inches="tight")
+    save_fast(fig, path)
     print(f"Saved: {path}")
     plt.close()
 
@@ -359,14 +519,13 @@ def save_params(params, ols_model, spread_col):
 
     # Month effects from OLS (for seasonality in forecast)
     params["month_coefs"] = {
-        str(k): float(v) for k, v in ols_model.params.items()
-        if str(k).startswith("month_")
+        k: float(v) for k, v in ols_model.params.items()
+        if k.startswith("month_")
     }
     params["weekend_coef"] = float(ols_model.params.get("weekend", 0))
 
     path = os.path.join(PROCESSED_DIR, "spread_model_params.json")
-    with open(path, "w") as f:
-        json.dump(params, f, indent=2)
+    write_json(path, params)
     print(f"\nSaved model params: {path}")
 
     return params
@@ -382,22 +541,22 @@ def main():
     df, spread_col, price_col = load_and_merge()
 
     # 1. OLS regressions (for diagnostics and month/weekend effects)
-    ols_with_year, ols_df = run_ols(df, spread_col, include_year_dummies=True)
-    print()
-    ols_no_year, _ = run_ols(df, spread_col, include_year_dummies=False)
+    ols_with_year, ols_df = run_ols(df, spread_col)
 
     bess_with = ols_with_year.params.get("bess_gw", 0)
-    bess_without = ols_no_year.params.get("bess_gw", 0)
+    bess_without, se_without, p_without = coef_without_year_dummies(ols_with_year, "bess_gw")
     print(f"\n  OLS BESS coef with year dummies: {bess_with:+.2f}")
-    print(f"  OLS BESS coef without year dummies: {bess_without:+.2f}")
+    print(f"  OLS BESS coef without year dummies: {bess_without:+.2f} "
+          f"(SE={se_without:.2f}, p={p_without:.4f})")
     print(f"  (Both are unreliable — using power-law instead)")
 
     # 2. Power-law model
-    monthly = fit_power_law(df, spread_col)
+    monthly_all = monthly_means(df, spread_col)
+    monthly = fit_power_law(monthly_all)
     params = calibrate_params(monthly, spread_col)
 
     # 3. Plots
-    plot_model(df, monthly, params, spread_col, ols_with_year, ols_df)
+    plot_model(df, monthly, monthly_all, params, spread_col, ols_with_year, ols_df)
     plot_diagnostics(ols_with_year)
 
     # 4. Save
@@ -21,15 +21,38 @@ Outputs:
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
-import json
 import os
 
+from _data import load_processed, write_json
+from _kernels import rolling_mean
+from _plotting import save_fast
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 PLOT_DIR = os.path.join(PROCESSED_DIR, "plots")
 
 
+def simple_ols_hc1(x, y):
+    """
+    Closed-form y = a + b*x with an HC1 standard error on the slope.
+
+    Returns (intercept, slope, slope_se, r_squared). Same estimates as
+    statsmodels OLS with cov_type="HC1", from a few O(n) passes.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = dx @ dx
+    slope = (dx @ dy) / sxx
+    intercept = y.mean() - slope * x.mean()
+    e = y - (intercept + slope * x)
+    slope_se = np.sqrt((dx * dx) @ (e * e) / sxx ** 2 * n / (n - 2))
+    r_squared = 1.0 - (e @ e) / (dy @ dy)
+    return intercept, slope, slope_se, r_squared
+
+
 def main():
     os.makedirs(PLOT_DIR, exist_ok=True)
 
@@ -39,7 +62,8 @@ def main():
 
     # Load Agile-derived spread data
     agile_path = os.path.join(PROCESSED_DIR, "daily_wholesale_spread.csv")
-    agile = pd.read_csv(agile_path, parse_dates=["date"])
+    agile = load_processed(
+        agile_path, columns=["date", "spread_max_min", "price_mean", "price_max", "price_min"])
     print(f"Agile spread data: {len(agile)} days")
 
     # Load Elexon wholesale if available
@@ -47,7 +71,7 @@ def main():
     has_elexon = os.path.exists(elexon_path)
 
     if has_elexon:
-        elexon = pd.read_csv(elexon_path, parse_dates=["date"])
+        elexon = load_processed(elexon_path, columns=["date", "wholesale_spread", "wholesale_mean"])
         print(f"Elexon wholesale data: {len(elexon)} days")
 
         # Merge
@@ -61,35 +85,29 @@ def main():
 
         # --- Regression: Agile spread = α + β × wholesale spread ---
         print("\n--- Spread pass-through regression ---")
-        X = sm.add_constant(merged["wholesale_spread"])
-        y = merged["spread_max_min"]
-
-        model = sm.OLS(y, X).fit(cov_type="HC1")
-        print(f"R-squared: {model.rsquared:.3f}")
-        print(f"Intercept: {model.params['const']:.2f}")
-        print(f"Slope (multiplier): {model.params['wholesale_spread']:.3f}")
-        print(f"  SE: {model.bse['wholesale_spread']:.3f}")
-
-        multiplier = model.params["wholesale_spread"]
-        intercept = model.params["const"]
+        intercept, multiplier, multiplier_se, spread_r2 = simple_ols_hc1(
+            merged["wholesale_spread"].to_numpy(), merged["spread_max_min"].to_numpy())
+        print(f"R-squared: {spread_r2:.3f}")
+        print(f"Intercept: {intercept:.2f}")
+        print(f"Slope (multiplier): {multiplier:.3f}")
+        print(f"  SE: {multiplier_se:.3f}")
 
         # --- Price level regression ---
         print("\n--- Price level regression ---")
-        X2 = sm.add_constant(merged["wholesale_mean"])
-        y2 = merged["price_mean"]
-        model2 = sm.OLS(y2, X2).fit(cov_type="HC1")
-        print(f"R-squared: {model2.rsquared:.3f}")
-        print(f"Intercept: {model2.params['const']:.2f} (£/MWh — the 'adder')")
-        print(f"Slope: {model2.params['wholesale_mean']:.3f} (the regional multiplier)")
+        adder, price_multiplier, _, price_r2 = simple_ols_hc1(
+            merged["wholesale_mean"].to_numpy(), merged["price_mean"].to_numpy())
+        print(f"R-squared: {price_r2:.3f}")
+        print(f"Intercept: {adder:.2f} (£/MWh — the 'adder')")
+        print(f"Slope: {price_multiplier:.3f} (the regional multiplier)")
 
         # Save params
         params = {
             "spread_multiplier": float(multiplier),
             "spread_intercept": float(intercept),
-            "spread_r_squared": float(model.rsquared),
-            "price_multiplier": float(model2.params["wholesale_mean"]),
-            "price_adder_mwh": float(model2.params["const"]),
-            "price_r_squared": float(model2.rsquared),
+            "spread_r_squared": float(spread_r2),
+            "price_multiplier": float(price_multiplier),
+            "price_adder_mwh": float(adder),
+            "price_r_squared": float(price_r2),
             "n_obs": int(len(merged)),
         }
 
@@ -104,7 +122,7 @@ def main():
                               merged["wholesale_spread"].max(), 100)
         ax.plot(x_range, intercept + multiplier * x_range,
                 color="coral", linewidth=2,
-                label=f"y = {intercept:.1f} + {multiplier:.2f}x (R²={model.rsquared:.2f})")
+                label=f"y = {intercept:.1f} + {multiplier:.2f}x (R²={spread_r2:.2f})")
         ax.set_xlabel("Elexon Wholesale Spread (£/MWh)")
         ax.set_ylabel("Agile Spread (£/MWh)")
         ax.set_title("Spread Pass-Through")
@@ -118,10 +136,10 @@ def main():
         x_range = np.linspace(merged["wholesale_mean"].min(),
                               merged["wholesale_mean"].max(), 100)
         ax.plot(x_range,
-                model2.params["const"] + model2.params["wholesale_mean"] * x_range,
+                adder + price_multiplier * x_range,
                 color="coral", linewidth=2,
-                label=f"multiplier={model2.params['wholesale_mean']:.2f}, "
-                      f"adder=£{model2.params['const']:.0f}/MWh")
+                label=f"multiplier={price_multiplier:.2f}, "
+                      f"adder=£{adder:.0f}/MWh")
         ax.set_xlabel("Elexon Wholesale Mean (£/MWh)")
         ax.set_ylabel("Agile Mean Price (£/MWh)")
         ax.set_title("Price Level Relationship")
@@ -131,10 +149,11 @@ def main():
         # Time series comparison
         ax = axes[2]
         merged_sorted = merged.sort_values("date")
-        agile_ma = merged_sorted.set_index("date")["spread_max_min"].rolling(30, min_periods=7).mean()
-        elexon_ma = merged_sorted.set_index("date")["wholesale_spread"].rolling(30, min_periods=7).mean()
-        ax.plot(agile_ma.index, agile_ma, label="Agile spread", color="steelblue")
-        ax.plot(elexon_ma.index, elexon_ma, label="Elexon wholesale spread", color="coral")
+        dates = merged_sorted["date"].to_numpy()
+        agile_ma = rolling_mean(merged_sorted["spread_max_min"].to_numpy(), 30, 7)
+        elexon_ma = rolling_mean(merged_sorted["wholesale_spread"].to_numpy(), 30, 7)
+        ax.plot(dates, agile_ma, label="Agile spread", color="steelblue")
+        ax.plot(dates, elexon_ma, label="Elexon wholesale spread", color="coral")
         ax.set_ylabel("Spread (£/MWh)")
         ax.set_title("Spread Over Time (30d rolling avg)")
         ax.legend()
@@ -163,22 +182,21 @@ def main():
         # Simple plot of Agile spread over time
         fig, ax = plt.subplots(figsize=(14, 5))
         agile_sorted = agile.sort_values("date")
-        ma = agile_sorted.set_index("date")["spread_max_min"].rolling(30, min_periods=7).mean()
-        ax.plot(ma.index, ma, color="steelblue", linewidth=2)
+        ma = rolling_mean(agile_sorted["spread_max_min"].to_numpy(), 30, 7)
+        ax.plot(agile_sorted["date"].to_numpy(), ma, color="steelblue", linewidth=2)
         ax.set_ylabel("Agile Spread (£/MWh)")
         ax.set_title("Daily Agile Tariff Spread (30d rolling avg)")
         ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
     path = os.path.join(PLOT_DIR, "04_tariff_model.png")
-    plt.savefig(path, dpi=150, bbox_inches="tight")
+    save_fast(fig, path)
     print(f"\nSaved plot: {path}")
     plt.close()
 
     # Save params
     params_path = os.path.join(PROCESSED_DIR, "tariff_model_params.json")
-    with open(params_path, "w") as f:
-        json.dump(params, f, indent=2)
+    write_json(params_path, params)
     print(f"Saved params: {params_path}")
 
     print(f"\n{'=' * 60}")
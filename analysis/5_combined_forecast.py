@@ -27,15 +27,23 @@ Outputs:
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # headless: select the file backend before pyplot loads
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import json
 import os
 
+from _data import load_processed
+from _plotting import save_fast
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 PLOT_DIR = os.path.join(PROCESSED_DIR, "plots")
 
+# First forecast month, marked on the sensitivity panels
+FORECAST_START = pd.Timestamp("2026-01-01")
+
 
 def load_params(filename):
     path = os.path.join(PROCESSED_DIR, filename)
@@ -51,28 +59,36 @@ def power_law_spread(bess_gw, floor, spread_ref, bess_ref, alpha):
 
     As bess_gw grows beyond bess_ref, spread decays toward floor.
     """
-    return floor + (spread_ref - floor) * (bess_ref / bess_gw) ** alpha
+    return spread_from_log_ratio(np.log(bess_ref / bess_gw), floor, spread_ref, alpha)
+
+
+def spread_from_log_ratio(log_ratio, floor, spread_ref, alpha):
+    """
+    power_law_spread() given log(bess_ref / bess_gw) precomputed.
+
+    Sweeping alpha over the same capacities reuses one log and costs a single
+    exp per element for each alpha.
+    """
+    return floor + (spread_ref - floor) * np.exp(alpha * log_ratio)
 
 
-def seasonal_adjustment(month, month_coefs, spread_ref):
+def seasonal_multipliers(month_coefs, spread_ref):
     """
-    Apply month seasonality as a multiplicative factor.
+    Month seasonality as multiplicative factors, indexed by month number.
 
     The OLS month_coefs are additive offsets from the January baseline.
     We convert these to a multiplicative factor relative to the annual mean
     so the power-law level is preserved but seasonality is overlaid.
+
+    Returns a length-13 array so `table[month]` works for months 1-12;
+    slot 0 is unused.
     """
     # Month 1 (January) is the reference (no dummy), so its effect = 0
-    month_key = f"month_{month}"
-    month_effect = month_coefs.get(month_key, 0.0)
-
-    # Average month effect across the year (including month 1 = 0)
-    all_effects = [0.0] + [month_coefs.get(f"month_{m}", 0.0) for m in range(2, 13)]
-    avg_effect = np.mean(all_effects)
+    month_effects = np.array([0.0] + [month_coefs.get(f"month_{m}", 0.0) for m in range(2, 13)])
 
-    # Multiplicative adjustment: how much this month deviates from annual mean
-    # Use ratio to spread_ref so it scales properly
-    return 1.0 + (month_effect - avg_effect) / spread_ref
+    # Multiplicative adjustment: how much each month deviates from the annual
+    # mean. Use ratio to spread_ref so it scales properly
+    return np.concatenate([[np.nan], 1.0 + (month_effects - month_effects.mean()) / spread_ref])
 
 
 def project_wind_generation(forecast_dates):
@@ -80,7 +96,7 @@ def project_wind_generation(forecast_dates):
     ren_path = os.path.join(PROCESSED_DIR, "renewable_capacity_monthly.csv")
 
     if os.path.exists(ren_path):
-        ren = pd.read_csv(ren_path, parse_dates=["date"])
+        ren = load_processed(ren_path, columns=["date", "total_wind_gw"])
         latest = ren.iloc[-1]
         latest_date = ren["date"].max()
 
@@ -122,6 +138,7 @@ def main():
     alpha_low = spread_params["alpha_low"]
     alpha_high = spread_params["alpha_high"]
     month_coefs = spread_params.get("month_coefs", {})
+    season_table = seasonal_multipliers(month_coefs, spread_ref)
 
     price_multiplier = tariff_params.get("price_multiplier", 1.31)
 
@@ -133,7 +150,7 @@ def main():
 
     # Load BESS forecast
     bess_path = os.path.join(PROCESSED_DIR, "bess_forecast.csv")
-    bess = pd.read_csv(bess_path, parse_dates=["date"])
+    bess = load_processed(bess_path, columns=["date", "bess_capacity_gw"])
     print(f"\nBESS forecast: {len(bess)} months, "
           f"{bess['bess_capacity_gw'].iloc[0]:.1f} to {bess['bess_capacity_gw'].iloc[-1]:.1f} GW")
 
@@ -141,7 +158,7 @@ def main():
     scenarios_path = os.path.join(PROCESSED_DIR, "bess_fes_scenarios.csv")
     scenarios = None
     if os.path.exists(scenarios_path):
-        scenarios = pd.read_csv(scenarios_path, parse_dates=["date"])
+        scenarios = load_processed(scenarios_path)
 
     # Project wind generation
     forecast_dates = pd.to_datetime(bess["date"].values)
@@ -149,56 +166,56 @@ def main():
 
     # --- Base case forecast ---
     print("\n--- Generating base case forecast ---")
-    results = []
-    for _, bess_row in bess.iterrows():
-        date = bess_row["date"]
-        bess_gw = bess_row["bess_capacity_gw"]
-        month = date.month
-
-        wind_row = wind_proj[wind_proj["date"] == date]
-        wind_gen = wind_row["wind_gen_gw"].values[0] if not wind_row.empty else 6.8
-
-        # Power-law spread (annual average level)
-        ws_annual = power_law_spread(bess_gw, floor, spread_ref, bess_ref, alpha)
-
-        # Apply seasonal adjustment
-        season_mult = seasonal_adjustment(month, month_coefs, spread_ref)
-        ws = max(ws_annual * season_mult, 0.0)
-
-        # Agile tariff spread
-        agile_spread = price_multiplier * ws
-        agile_spread_p_kwh = agile_spread / 10
-
-        # FES scenario spreads (vary BESS capacity)
-        ws_leading = None
-        ws_falling = None
-        if scenarios is not None:
-            ltw = scenarios[(scenarios["scenario"] == "leading_the_way") &
-                            (scenarios["date"] == date)]
-            if not ltw.empty:
-                ltw_annual = power_law_spread(ltw["bess_capacity_gw"].values[0],
-                                              floor, spread_ref, bess_ref, alpha)
-                ws_leading = max(ltw_annual * season_mult, 0.0)
-
-            fs = scenarios[(scenarios["scenario"] == "falling_short") &
-                           (scenarios["date"] == date)]
-            if not fs.empty:
-                fs_annual = power_law_spread(fs["bess_capacity_gw"].values[0],
-                                             floor, spread_ref, bess_ref, alpha)
-                ws_falling = max(fs_annual * season_mult, 0.0)
-
-        results.append({
-            "date": date,
-            "bess_gw": bess_gw,
-            "wind_gen_gw": wind_gen,
-            "wholesale_spread_mwh": ws,
-            "agile_spread_mwh": agile_spread,
-            "agile_spread_p_kwh": agile_spread_p_kwh,
-            "spread_leading_the_way": ws_leading,
-            "spread_falling_short": ws_falling,
-        })
-
-    forecast = pd.DataFrame(results)
+    # Align wind and the two FES band scenarios to the forecast months with
+    # joins, then evaluate every month in one vectorised pass
+    base = bess[["date", "bess_capacity_gw"]].copy(deep=False)
+    # Index lookup for wind instead of scanning the projection per month
+    base["wind_gen_gw"] = (wind_proj.set_index("date")["wind_gen_gw"]
+                           .reindex(forecast_dates).fillna(6.8).to_numpy())
+    # One pivot of the FES band scenarios onto the forecast months; the
+    # plots below reuse it rather than filtering the long frame again
+    band = None
+    if scenarios is not None:
+        band = (scenarios.pivot(index="date", columns="scenario", values="bess_capacity_gw")
+                .reindex(index=forecast_dates, columns=["leading_the_way", "falling_short"]))
+        base["leading_the_way"] = band["leading_the_way"].to_numpy()
+        base["falling_short"] = band["falling_short"].to_numpy()
+    else:
+        base["leading_the_way"] = np.nan
+        base["falling_short"] = np.nan
+
+    season_mult = season_table[base["date"].dt.month.to_numpy()]
+
+    bess_gw = base["bess_capacity_gw"].to_numpy()
+    # Shared by the central spread and the alpha sensitivity curves below
+    log_ratio = np.log(bess_ref / bess_gw)
+
+    # Power-law spread (annual average level) with seasonal adjustment
+    ws_annual = spread_from_log_ratio(log_ratio, floor, spread_ref, alpha)
+    ws = ws_annual * season_mult
+    np.maximum(ws, 0.0, out=ws)  # clip in place, no second array
+
+    # Agile tariff spread
+    agile_spread = price_multiplier * ws
+
+    # FES scenario spreads (vary BESS capacity); NaN where a scenario has no month
+    ws_leading = power_law_spread(base["leading_the_way"].to_numpy(),
+                                  floor, spread_ref, bess_ref, alpha) * season_mult
+    ws_falling = power_law_spread(base["falling_short"].to_numpy(),
+                                  floor, spread_ref, bess_ref, alpha) * season_mult
+    np.maximum(ws_leading, 0.0, out=ws_leading)
+    np.maximum(ws_falling, 0.0, out=ws_falling)
+
+    forecast = pd.DataFrame({
+        "date": base["date"],
+        "bess_gw": bess_gw,
+        "wind_gen_gw": base["wind_gen_gw"].to_numpy(),
+        "wholesale_spread_mwh": ws,
+        "agile_spread_mwh": agile_spread,
+        "agile_spread_p_kwh": agile_spread / 10,
+        "spread_leading_the_way": ws_leading,
+        "spread_falling_short": ws_falling,
+    })
 
     # Save
     forecast_path = os.path.join(PROCESSED_DIR, "five_year_forecast.csv")
@@ -208,7 +225,7 @@ def main():
     # --- Load historic for context ---
     elexon_path = os.path.join(PROCESSED_DIR, "daily_elexon_wholesale.csv")
     if os.path.exists(elexon_path):
-        historic = pd.read_csv(elexon_path, parse_dates=["date"])
+        historic = load_processed(elexon_path, columns=["date", "wholesale_spread"])
         hist_monthly = historic.set_index("date").resample("MS").agg(
             spread_mean=("wholesale_spread", "mean"),
         ).reset_index()
@@ -222,15 +239,14 @@ def main():
     ax = axes[0]
     ax.plot(forecast["date"], forecast["bess_gw"], color="purple", linewidth=2.5,
             label="Base case (System Transformation)")
-    if scenarios is not None:
+    if band is not None:
         for scenario, color, label in [
             ("leading_the_way", "#7B2FBE", "Leading the Way"),
             ("falling_short", "#E9D5FF", "Falling Short"),
         ]:
-            sdf = scenarios[scenarios["scenario"] == scenario]
-            filt = sdf[sdf["date"].isin(forecast["date"])]
+            filt = band[scenario].dropna()
             if not filt.empty:
-                ax.plot(filt["date"], filt["bess_capacity_gw"],
+                ax.plot(filt.index, filt.to_numpy(),
                         color=color, linewidth=1.5, linestyle="--", label=label)
     ax.set_ylabel("BESS Capacity (GW)")
     ax.set_title("5-Year Forecast: BESS Growth → Spread Compression → Agile Tariff")
@@ -267,13 +283,14 @@ def main():
     ax.legend()
     ax.grid(True, alpha=0.3)
 
-    for ax in axes:
-        ax.xaxis.set_major_locator(mdates.YearLocator())
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
+    # The panels share x, and with it the tick locator and formatter, so
+    # setting them on one axis covers all of them
+    axes[0].xaxis.set_major_locator(mdates.YearLocator())
+    axes[0].xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
 
     plt.tight_layout()
     path = os.path.join(PLOT_DIR, "05_combined_forecast.png")
-    plt.savefig(path, dpi=150, bbox_inches="tight")
+    save_fast(fig, path)
     print(f"Saved: {path}")
     plt.close()
 
@@ -294,15 +311,12 @@ def main():
         (alpha_low, f"Conservative (α={alpha_low})", "--"),
         (alpha_high, f"Aggressive (α={alpha_high})", ":"),
     ]:
-        spreads = []
-        for _, row in forecast.iterrows():
-            s_ann = power_law_spread(row["bess_gw"], floor, spread_ref, bess_ref, a)
-            s_mult = seasonal_adjustment(row["date"].month, month_coefs, spread_ref)
-            spreads.append(max(s_ann * s_mult, 0.0))
+        spreads = spread_from_log_ratio(log_ratio, floor, spread_ref, a) * season_mult
+        np.maximum(spreads, 0.0, out=spreads)
         ax.plot(forecast["date"], spreads, color="coral", linewidth=1.5,
                 linestyle=ls, label=label)
 
-    ax.axvline(pd.Timestamp("2026-01-01"), color="gray", linestyle=":", alpha=0.5)
+    ax.axvline(FORECAST_START, color="gray", linestyle=":", alpha=0.5)
     ax.set_ylabel("Wholesale Spread (£/MWh)")
     ax.set_title("Sensitivity: Alpha (compression rate)")
     ax.legend()
@@ -329,20 +343,21 @@ def main():
             alpha=0.1, color="coral"
         )
 
-    ax.axvline(pd.Timestamp("2026-01-01"), color="gray", linestyle=":", alpha=0.5)
+    ax.axvline(FORECAST_START, color="gray", linestyle=":", alpha=0.5)
     ax.set_xlabel("Date")
     ax.set_ylabel("Wholesale Spread (£/MWh)")
     ax.set_title("Sensitivity: FES BESS Scenarios")
     ax.legend()
     ax.grid(True, alpha=0.3)
 
-    for ax in axes:
-        ax.xaxis.set_major_locator(mdates.YearLocator())
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
+    # The panels share x, and with it the tick locator and formatter, so
+    # setting them on one axis covers all of them
+    axes[0].xaxis.set_major_locator(mdates.YearLocator())
+    axes[0].xaxis.set_major_formatter(mdates.DateFormatter("%Y"))
 
     plt.tight_layout()
     path = os.path.join(PLOT_DIR, "05_sensitivity.png")
-    plt.savefig(path, dpi=150, bbox_inches="tight")
+    save_fast(fig, path)
     print(f"Saved: {path}")
     plt.close()
 
@@ -353,12 +368,11 @@ def main():
     print(f"\n{'Year':<6} {'BESS (GW)':<12} {'Spread (£/MWh)':<18} {'Agile Spread (p/kWh)'}")
     print("-" * 58)
 
-    for year in range(2026, 2031):
-        ydf = forecast[forecast["date"].dt.year == year]
-        if ydf.empty:
-            continue
-        print(f"{year:<6} {ydf['bess_gw'].mean():<12.1f} {ydf['wholesale_spread_mwh'].mean():<18.1f} "
-              f"{ydf['agile_spread_p_kwh'].mean():.1f}")
+    # Yearly means in one grouping pass rather than a mask per year
+    yearly = (forecast.groupby(forecast["date"].dt.year)
+              [["bess_gw", "wholesale_spread_mwh", "agile_spread_p_kwh"]].mean())
+    for year, bess_mean, ws_mean, agile_mean in yearly.loc[2026:2030].itertuples():
+        print(f"{year:<6} {bess_mean:<12.1f} {ws_mean:<18.1f} {agile_mean:.1f}")
 
     print(f"\nModel: spread = {floor:.0f} + ({spread_ref:.0f} - {floor:.0f})"
           f" × ({bess_ref:.1f} / bess_gw)^{alpha}")
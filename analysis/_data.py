@@ -0,0 +1,166 @@
+"""
+Shared loading helpers for the analysis scripts.
+
+Processed CSVs are parsed once and memoized as a Parquet sidecar next to the
+CSV (same name, .parquet extension). Later loads read the sidecar as long as it
+is at least as new as the CSV, so re-running a fetcher invalidates it. Fetchers
+that save through fetch/_storage.py write the sidecar themselves, so the first
+analysis run after a fetch skips the CSV parse as well.
+
+CSVs are parsed with the pyarrow engine against an explicit per-file schema, so
+there is no dtype-inference pass. Schemas are keyed by filename rather than by
+script so every script sees the same dtypes through the shared sidecar. Float
+columns stay float64, since the model scripts estimate from them and persist
+the results; plotting code that only draws the series can ask
+load_processed() for float32 copies (`downcast=True`), halving the bandwidth
+of the rolling means and plot uploads.
+
+The `date` column is read as plain strings and converted with an explicit ISO
+format and `cache=True`, so each distinct date is parsed once; monthly files
+repeat the same few dates across scenarios and services.
+
+load_processed() adds an in-process memo on top, keyed on the CSV's mtime, so
+repeated loads of the same file within one run skip even the Parquet decode.
+
+is_fresh() is the make-style check the scripts use to skip re-rendering a plot
+whose inputs (CSVs and the script itself) are all older than the output.
+
+write_json() saves model parameters with orjson when it is installed, falling
+back to the stdlib json module.
+"""
+
+import functools
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Column dtypes for each processed file; `date` is parsed separately
+SCHEMAS = {
+    "daily_wholesale_spread.csv": {
+        "price_max": "float64",
+        "price_min": "float64",
+        "price_mean": "float64",
+        "price_p90": "float64",
+        "price_p10": "float64",
+        "n_periods": "int64",
+        "spread_max_min": "float64",
+        "spread_p90_p10": "float64",
+    },
+    "daily_wind_solar_generation.csv": {
+        "wind_gen_gw": "float64",
+        "solar_gen_gw": "float64",
+        "wind_gen_mw": "float64",
+        "solar_gen_mw": "float64",
+    },
+    "daily_elexon_wholesale.csv": {
+        "wholesale_mean": "float64",
+        "wholesale_max": "float64",
+        "wholesale_min": "float64",
+        "wholesale_spread": "float64",
+        "n_periods": "int64",
+    },
+    "bess_capacity_monthly.csv": {
+        "bess_capacity_gw": "float64",
+        "source": "category",
+    },
+    "bess_fes_scenarios.csv": {
+        "bess_capacity_gw": "float64",
+        "scenario": "category",
+    },
+    "bess_forecast.csv": {
+        "bess_capacity_gw": "float64",
+        "source": "category",
+    },
+    "renewable_capacity_monthly.csv": {
+        "onshore_wind_gw": "float64",
+        "offshore_wind_gw": "float64",
+        "solar_gw": "float64",
+        "total_wind_gw": "float64",
+        "total_renewables_gw": "float64",
+    },
+    "ancillary_daily_prices.csv": {
+        "service": "category",
+        "clearing_price_mw_h": "float64",
+    },
+}
+
+
+def cached_read(path, columns=None):
+    """
+    Load a processed CSV, preferring a fresh Parquet sidecar when available.
+
+    `columns` limits the result to those fields. From the sidecar only they
+    are decoded; on a cache miss the whole CSV is parsed once so the sidecar
+    is complete for every later caller.
+    """
+    path = Path(path)
+    parquet_path = path.with_suffix(".parquet")
+
+    dtypes = SCHEMAS.get(path.name, {})
+
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+        df = pd.read_parquet(parquet_path, engine="pyarrow",
+                             columns=list(columns) if columns else None)
+        # A sidecar that stored float64 columns as float32 has already lost
+        # precision, so it is rebuilt from the CSV below. Otherwise astype is
+        # a no-op when the sidecar matches, and brings other older sidecars
+        # into line with the schema
+        if not any(df[c].dtype == np.float32
+                   for c, t in dtypes.items() if t == "float64" and c in df.columns):
+            return df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+
+    schema = {"date": "str", **dtypes}
+    df = pd.read_csv(path, engine="pyarrow", dtype=schema)
+    df["date"] = pd.to_datetime(df["date"], format=DATE_FORMAT, cache=True)
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+    except OSError as e:
+        print(f"  Could not write Parquet cache {parquet_path}: {e}")
+    return df[list(columns)] if columns else df
+
+
+@functools.lru_cache(maxsize=32)
+def _load_processed(path, mtime, columns):
+    return cached_read(path, columns)
+
+
+def load_processed(path, columns=None, downcast=False):
+    """
+    cached_read() memoized per process; editing the CSV invalidates the entry.
+
+    `downcast=True` returns float columns as float32, for plotting paths only;
+    anything estimated or written back out should use the float64 default.
+    """
+    # Hand out a copy so callers can sort or add columns without touching the memo
+    path = Path(path)
+    columns = tuple(columns) if columns else None
+    df = _load_processed(path, path.stat().st_mtime, columns)
+    if downcast:
+        return df.astype({c: np.float32 for c in df.columns if df[c].dtype == np.float64})
+    return df.copy()
+
+
+def is_fresh(out, inputs):
+    """True if `out` exists and is at least as new as every path in `inputs`."""
+    out = Path(out)
+    return (out.exists()
+            and out.stat().st_mtime >= max(Path(p).stat().st_mtime for p in inputs))
+
+
+def write_json(path, obj):
+    """Write `obj` as indented JSON, using orjson if available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2)
@@ -0,0 +1,100 @@
+"""
+Small numeric kernels shared by the analysis scripts.
+
+rolling_mean() is a streaming trailing-window mean: a running sum and count are
+updated by adding the newest value and dropping the one leaving the window, so
+each call is a single O(N) pass whatever the window length. It matches pandas'
+`Series.rolling(window, min_periods).mean()` including NaN handling.
+
+power_law() evaluates the spread-compression curve
+`floor + (spread_ref - floor) * (bess_ref / bess)^alpha` elementwise, for curve
+plots and alpha sweeps.
+
+numba is optional. When it is installed the loops are compiled with
+`@njit(cache=True)` and the machine code is cached on disk after the first run;
+otherwise equivalent NumPy versions are used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _rolling_mean_loop(x, window, min_periods):
+    out = np.empty(x.shape[0])
+    total = 0.0
+    count = 0
+    for i in range(x.shape[0]):
+        v = x[i]
+        if not np.isnan(v):
+            total += v
+            count += 1
+        if i >= window:
+            old = x[i - window]
+            if not np.isnan(old):
+                total -= old
+                count -= 1
+        if count >= min_periods and count > 0:
+            out[i] = total / count
+        else:
+            out[i] = np.nan
+    return out
+
+
+def _rolling_mean_numpy(x, window, min_periods):
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+
+    hi = np.arange(1, x.shape[0] + 1)
+    lo = np.maximum(hi - window, 0)
+    total = csum[hi] - csum[lo]
+    count = ccount[hi] - ccount[lo]
+
+    out = np.full(x.shape[0], np.nan)
+    ok = (count >= min_periods) & (count > 0)
+    out[ok] = total[ok] / count[ok]
+    return out
+
+
+if njit is not None:
+    _rolling_mean_impl = njit(cache=True)(_rolling_mean_loop)
+else:
+    _rolling_mean_impl = _rolling_mean_numpy
+
+
+def rolling_mean(x, window, min_periods):
+    """Trailing mean over the last `window` values, NaN if fewer than `min_periods` are valid."""
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    return _rolling_mean_impl(x, window, min_periods)
+
+
+def _power_law_loop(bess, floor, spread_ref, bess_ref, alpha):
+    out = np.empty(bess.shape[0])
+    scale = spread_ref - floor
+    for i in range(bess.shape[0]):
+        out[i] = floor + scale * (bess_ref / bess[i]) ** alpha
+    return out
+
+
+def _power_law_numpy(bess, floor, spread_ref, bess_ref, alpha):
+    return floor + (spread_ref - floor) * (bess_ref / bess) ** alpha
+
+
+if njit is not None:
+    # Capacities are strictly positive, so fastmath's no-NaN/no-inf
+    # assumptions hold and the pow call can be vectorised freely
+    _power_law_impl = njit(cache=True, fastmath=True)(_power_law_loop)
+else:
+    _power_law_impl = _power_law_numpy
+
+
+def power_law(bess, floor, spread_ref, bess_ref, alpha):
+    """Power-law spread with floor, evaluated elementwise over an array of capacities."""
+    bess = np.asarray(bess, dtype=np.float64)
+    flat = np.ascontiguousarray(bess.ravel())
+    return _power_law_impl(flat, float(floor), float(spread_ref),
+                           float(bess_ref), float(alpha)).reshape(bess.shape)
@@ -0,0 +1,21 @@
+"""
+Shared figure output for the analysis scripts.
+
+save_fast() renders a figure once on the Agg canvas and hands the RGBA buffer
+straight to Pillow's PNG encoder at compress_level=1. Compared with
+`savefig(dpi=150, bbox_inches="tight")` this skips the second layout pass that
+the tight bbox needs, and zlib level 1 encodes several times faster than
+matplotlib's default for files roughly a fifth larger. Call tight_layout()
+before saving so the margins stay trimmed.
+"""
+
+import numpy as np
+from PIL import Image
+
+
+def save_fast(fig, path, dpi=150):
+    """Render `fig` at `dpi` and write it as a quickly-compressed PNG."""
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    Image.fromarray(rgba).save(path, optimize=False, compress_level=1)
@@ -0,0 +1,177 @@
+"""
+Shared HTTP session for the fetch scripts.
+
+SESSION keeps connections alive between requests, so paginated API calls reuse
+one TLS session per host instead of handshaking on every page. The mounted
+adapter retries transient failures (rate limiting and 5xx) with exponential
+backoff before the caller ever sees an exception.
+
+When requests-cache is installed and data/raw/ already exists, SESSION is a
+CachedSession backed by data/raw/http_cache.sqlite: repeated GETs within
+HTTP_CACHE_EXPIRY are answered from disk, older entries are revalidated with
+their stored validators, and a stale entry is served if the server errors.
+The Elexon and Octopus APIs are never cached here: their recent data changes
+between calls and the fetchers manage their own freshness (the Elexon chunk
+cache, the Agile incremental resume). Otherwise SESSION is a plain
+requests.Session and every call goes to the network. cache_disabled() turns
+the HTTP cache off for a block of requests.
+
+TokenBucket throttles requests shared across worker threads: each call to
+acquire() takes one token, blocking until the bucket has refilled enough.
+
+conditional_download() refreshes a whole-file download only when the server
+copy has changed. The response's ETag and Last-Modified are kept in a
+`<file>.meta.json` sidecar and sent back as If-None-Match / If-Modified-Since
+on the next run, so an unchanged file costs a 304 and a few hundred bytes. Changed files are
+streamed straight to disk.
+
+parse_json() decodes a JSON body (bytes) with orjson when it is installed,
+falling back to the stdlib json module.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from requests_cache import DO_NOT_CACHE, CachedSession
+except ImportError:
+    CachedSession = None
+
+HTTP_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "raw", "http_cache.sqlite")
+HTTP_CACHE_EXPIRY = timedelta(hours=6)
+# Hosts whose responses must always come from the network
+UNCACHED_HOSTS = ["data.elexon.co.uk", "api.octopus.energy"]
+
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "HEAD"],
+    # Hand the last response back so callers' raise_for_status() still fires
+    raise_on_status=False,
+)
+
+# Importing this module never creates directories: until a fetcher's main()
+# has made data/raw/, the session runs uncached
+if CachedSession is not None and os.path.isdir(os.path.dirname(HTTP_CACHE_PATH)):
+    SESSION = CachedSession(
+        HTTP_CACHE_PATH, backend="sqlite", expire_after=HTTP_CACHE_EXPIRY,
+        urls_expire_after={**{host: DO_NOT_CACHE for host in UNCACHED_HOSTS},
+                           "*": HTTP_CACHE_EXPIRY},
+        allowable_methods=["GET"], stale_if_error=True)
+else:
+    SESSION = requests.Session()
+SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "grid_stability/1.0"})
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+def cache_disabled(disabled=True):
+    """
+    Context in which SESSION bypasses the HTTP cache (a no-op without one).
+
+    requests-cache's switch is session-wide and not thread-safe, so enter it
+    around a whole batch of requests, not inside worker threads.
+    """
+    if disabled and hasattr(SESSION, "cache_disabled"):
+        return SESSION.cache_disabled()
+    return contextlib.nullcontext()
+
+
+def parse_json(body):
+    """Decode a JSON document given as bytes, using orjson if available."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class TokenBucket:
+    """Thread-safe rate limiter allowing `rate` requests per second on average."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _meta_path(path):
+    return path + ".meta.json"
+
+
+def conditional_download(url, path, timeout=120, min_bytes=0):
+    """
+    Download `url` to `path`, revalidating an existing copy with the server.
+
+    Returns True if a new body was written and False if the server answered
+    304 Not Modified (the local file is current). Raises on HTTP errors, and
+    with ValueError if the body is shorter than `min_bytes` (e.g. an HTML
+    error page in place of a workbook); nothing is written in either case.
+    """
+    headers = {}
+    if os.path.exists(path) and os.path.exists(_meta_path(path)):
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    # Stream the body to disk in 1 MiB pieces rather than holding it in memory.
+    # It goes to a temporary name first so an interrupted run never leaves a
+    # truncated file behind with validators claiming it is current
+    tmp_path = path + ".part"
+    with SESSION.get(url, headers=headers, timeout=timeout,
+                     allow_redirects=True, stream=True) as resp:
+        if resp.status_code == 304:
+            return False
+        resp.raise_for_status()
+        with open(tmp_path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+    size = os.path.getsize(tmp_path)
+    if size < min_bytes:
+        os.remove(tmp_path)
+        raise ValueError(f"response too small ({size} bytes)")
+    os.replace(tmp_path, path)
+
+    with open(_meta_path(path), "w") as f:
+        json.dump({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+        }, f, indent=2)
+    return True
@@ -0,0 +1,44 @@
+"""
+Shared output helpers for the fetch scripts.
+
+save_table() writes a frame as CSV, the canonical and diffable output, and then
+a Parquet sidecar next to it (same name, .parquet extension). The sidecar is
+written second so it is never older than its CSV; the analysis loaders in
+analysis/_data.py read it instead of parsing the CSV as long as that holds.
+Datetime columns are stored at microsecond resolution, the same unit the
+analysis loaders produce when they parse the CSV themselves.
+
+read_sidecar() is the matching reader for fetchers that reload their own
+output: it returns the sidecar if it is fresh and None otherwise, so the
+caller falls back to the CSV.
+"""
+
+import os
+
+import pandas as pd
+
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def save_table(df, path):
+    """Write `df` to the CSV at `path` plus its Parquet sidecar."""
+    df.to_csv(path, index=False)
+    datetimes = {c: df[c].dt.as_unit("us") for c in df.columns
+                 if pd.api.types.is_datetime64_any_dtype(df[c])}
+    try:
+        df.assign(**datetimes).to_parquet(
+            sidecar_path(path), engine="pyarrow", compression="zstd", index=False)
+    except OSError as e:
+        print(f"  Could not write Parquet copy of {path}: {e}")
+
+
+def read_sidecar(path):
+    """The Parquet sidecar of `path` if it is at least as new as the CSV, else None."""
+    parquet_path = sidecar_path(path)
+    if not (os.path.exists(path) and os.path.exists(parquet_path)):
+        return None
+    if os.path.getmtime(parquet_path) < os.path.getmtime(path):
+        return None
+    return pd.read_parquet(parquet_path, engine="pyarrow")
@@ -8,17 +8,21 @@ Calculates daily wholesale spread (max - min of half-hourly prices).
 Outputs:
   data/raw/agile_halfhourly.csv          - all half-hourly Agile rates
   data/processed/daily_wholesale_spread.csv - daily spread from derived wholesale prices
+  (each with a .parquet copy alongside for faster reloads)
 """
 
-import requests
 import pandas as pd
-import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+from _http import SESSION, TokenBucket
+from _storage import read_sidecar, save_table
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+RAW_PATH = os.path.join(RAW_DIR, "agile_halfhourly.csv")
 
 # Agile product codes in chronological order, with approximate date ranges
 # Region C = South England
@@ -57,6 +61,13 @@ PRODUCT_CODES = [
 
 API_BASE = "https://api.octopus.energy/v1/products"
 
+# Timestamp layout of valid_from/valid_to in API responses
+API_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Products are fetched concurrently; one shared bucket keeps the combined
+# request rate polite (about the old 0.3s per-page sleep)
+RATE_LIMIT = TokenBucket(rate=3)
+
 
 def fetch_product_rates(product, tariff, period_from, period_to):
     """Fetch all half-hourly rates for a product code within a date range."""
@@ -71,7 +82,8 @@ def fetch_product_rates(product, tariff, period_from, period_to):
             "page_size": 1500,
             "page": page,
         }
-        resp = requests.get(url, params=params, timeout=30)
+        RATE_LIMIT.acquire()
+        resp = SESSION.get(url, params=params, timeout=30)
 
         if resp.status_code == 404:
             break
@@ -88,38 +100,98 @@ def fetch_product_rates(product, tariff, period_from, period_to):
         if data.get("next") is None:
             break
         page += 1
-        time.sleep(0.3)
 
     return all_results
 
 
+def load_existing_agile():
+    """Previously fetched half-hourly rates from RAW_PATH, or None if absent."""
+    df = read_sidecar(RAW_PATH)
+    if df is None:
+        if not os.path.exists(RAW_PATH):
+            return None
+        df = pd.read_csv(RAW_PATH)
+        # to_csv writes "2019-01-01 00:00:00+00:00"; still ISO 8601
+        df["valid_from"] = pd.to_datetime(df["valid_from"], utc=True, format="ISO8601", cache=True)
+        df["valid_to"] = pd.to_datetime(df["valid_to"], utc=True, format="ISO8601", cache=True)
+    if df.empty:
+        return None
+    return df
+
+
 def fetch_all_agile():
-    """Fetch complete Agile history across all product codes."""
-    all_records = []
+    """
+    Fetch complete Agile history across all product codes.
 
+    Incremental: products that ended before the last saved half-hour are
+    skipped, and the open product is fetched from a day before that point.
+    New rows are merged with the saved history.
+    """
+    existing = load_existing_agile()
+    requests_by_product = {}
+    if existing is None:
+        for pc in PRODUCT_CODES:
+            requests_by_product[pc["product"]] = pc["from"]
+    else:
+        last = existing["valid_from"].max()
+        print(f"Existing data up to {last} ({len(existing)} rows)")
+        resume = (last - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        for pc in PRODUCT_CODES:
+            if pd.Timestamp(pc["to"], tz="UTC") <= last:
+                print(f"  {pc['product']}: complete, skipping")
+                continue
+            requests_by_product[pc["product"]] = max(pc["from"], resume)
+
+    with ThreadPoolExecutor(max_workers=len(PRODUCT_CODES)) as pool:
+        futures = {}
+        for pc in PRODUCT_CODES:
+            if pc["product"] not in requests_by_product:
+                continue
+            period_from = requests_by_product[pc["product"]]
+            print(f"\nFetching {pc['product']} ({period_from} to {pc['to']})...")
+            futures[pool.submit(fetch_product_rates, pc["product"], pc["tariff"],
+                                period_from, pc["to"])] = pc["product"]
+        by_product = {}
+        for future in as_completed(futures):
+            by_product[futures[future]] = future.result()
+
+    # Assemble in chronological product order so overlaps resolve as before;
+    # fields go straight into per-column lists rather than one dict per row
+    valid_from, valid_to, exc_vat, inc_vat, products = [], [], [], [], []
     for pc in PRODUCT_CODES:
-        print(f"\nFetching {pc['product']} ({pc['from']} to {pc['to']})...")
-        records = fetch_product_rates(pc["product"], pc["tariff"], pc["from"], pc["to"])
+        records = by_product.get(pc["product"], [])
         for r in records:
-            all_records.append({
-                "valid_from": r["valid_from"],
-                "valid_to": r["valid_to"],
-                "value_exc_vat": r["value_exc_vat"],
-                "value_inc_vat": r["value_inc_vat"],
-                "product": pc["product"],
-            })
-        time.sleep(1)
-
-    df = pd.DataFrame(all_records)
+            valid_from.append(r["valid_from"])
+            valid_to.append(r["valid_to"])
+            exc_vat.append(r["value_exc_vat"])
+            inc_vat.append(r["value_inc_vat"])
+        products.extend([pc["product"]] * len(records))
+
+    df = pd.DataFrame({
+        "valid_from": valid_from,
+        "valid_to": valid_to,
+        "value_exc_vat": exc_vat,
+        "value_inc_vat": inc_vat,
+        "product": products,
+    })
+    if not df.empty:
+        df["valid_from"] = pd.to_datetime(
+            df["valid_from"], utc=True, format=API_TIME_FORMAT, cache=True)
+        df["valid_to"] = pd.to_datetime(
+            df["valid_to"], utc=True, format=API_TIME_FORMAT, cache=True)
+    print(f"\nNew records fetched: {len(df)}")
+
+    if existing is not None:
+        # Fresh rows come last so they win the de-duplication below
+        df = pd.concat([existing, df], ignore_index=True) if not df.empty else existing
+
     if df.empty:
         print("WARNING: No Agile data fetched!")
         return df
 
-    df["valid_from"] = pd.to_datetime(df["valid_from"], utc=True)
-    df["valid_to"] = pd.to_datetime(df["valid_to"], utc=True)
-
-    # Remove duplicates (overlap between product codes)
-    df = df.sort_values("valid_from").drop_duplicates(subset=["valid_from"], keep="last")
+    # Remove duplicates (overlap between product codes and with saved history)
+    df = df.sort_values("valid_from", kind="stable").drop_duplicates(
+        subset=["valid_from"], keep="last")
     df = df.reset_index(drop=True)
 
     print(f"\nTotal records: {len(df)}")
@@ -147,32 +219,35 @@ def reverse_engineer_wholesale(df):
     by approximately the multiplier factor (~1.0-1.1 in recent products).
     We validate against Elexon market index data in the analysis step.
     """
-    df = df.copy()
-    # Convert p/kWh to £/MWh: multiply by 10
-    df["price_mwh"] = df["value_exc_vat"] * 10
-    return df
+    # Convert p/kWh to £/MWh: multiply by 10. assign returns a new frame
+    # without copying the existing columns
+    return df.assign(price_mwh=df["value_exc_vat"] * 10)
 
 
 def calculate_daily_spread(df):
     """Calculate daily wholesale spread (max - min) from half-hourly prices."""
-    df = df.copy()
-    df["date"] = df["valid_from"].dt.date
-
-    daily = df.groupby("date").agg(
-        price_max=("price_mwh", "max"),
-        price_min=("price_mwh", "min"),
-        price_mean=("price_mwh", "mean"),
-        price_p90=("price_mwh", lambda x: x.quantile(0.9)),
-        price_p10=("price_mwh", lambda x: x.quantile(0.1)),
-        n_periods=("price_mwh", "count"),
-    ).reset_index()
+    # Group on calendar days as datetime64 rather than Python date objects,
+    # which hash slowly; the key is passed directly, so no column is added
+    days = pd.Index(df["valid_from"].values.astype("datetime64[D]"), name="date")
+    grouped = df["price_mwh"].groupby(days)
+    daily = grouped.agg(
+        price_max="max",
+        price_min="min",
+        price_mean="mean",
+        n_periods="count",
+    )
+    # Both quantiles in one Cython groupby pass rather than a lambda per group
+    quantiles = grouped.quantile([0.9, 0.1]).unstack()
+    quantiles.columns = ["price_p90", "price_p10"]
+    daily = daily.join(quantiles)[
+        ["price_max", "price_min", "price_mean", "price_p90", "price_p10", "n_periods"]
+    ].reset_index()
 
     daily["spread_max_min"] = daily["price_max"] - daily["price_min"]
     daily["spread_p90_p10"] = daily["price_p90"] - daily["price_p10"]
 
     # Only keep days with reasonable data (at least 40 of 48 half-hours)
     daily = daily[daily["n_periods"] >= 40].copy()
-    daily["date"] = pd.to_datetime(daily["date"])
 
     return daily
 
@@ -191,9 +266,8 @@ def main():
         return
 
     # Save raw
-    raw_path = os.path.join(RAW_DIR, "agile_halfhourly.csv")
-    df.to_csv(raw_path, index=False)
-    print(f"\nSaved raw data: {raw_path} ({len(df)} rows)")
+    save_table(df, RAW_PATH)
+    print(f"\nSaved raw data: {RAW_PATH} ({len(df)} rows)")
 
     # Reverse-engineer wholesale prices
     df = reverse_engineer_wholesale(df)
@@ -202,7 +276,7 @@ def main():
     daily = calculate_daily_spread(df)
 
     spread_path = os.path.join(PROCESSED_DIR, "daily_wholesale_spread.csv")
-    daily.to_csv(spread_path, index=False)
+    save_table(daily, spread_path)
     print(f"Saved daily spread: {spread_path} ({len(daily)} rows)")
 
     # Summary
@@ -1,17 +1,20 @@
 """
-Run all data fetchers in sequence.
+Run all data fetchers concurrently.
 
 Usage:
   python fetch/fetch_all.py
 
-This will fetch/refresh all datasets. Each fetcher saves incrementally,
-so it's safe to interrupt and resume.
+This will fetch/refresh all datasets. The fetchers hit different sources and
+share no state, so they run side by side; each one's output is buffered and
+printed as a block when it finishes. Each fetcher saves incrementally, so it's
+safe to interrupt and resume.
 """
 
 import subprocess
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 SCRIPTS = [
     ("Octopus Agile tariff", "fetch/fetch_agile.py"),
@@ -29,22 +32,31 @@ def main():
     print("FETCHING ALL DATA")
     print("=" * 60)
 
-    for name, script in SCRIPTS:
-        print(f"\n{'─' * 60}")
-        print(f"▶ {name} ({script})")
-        print(f"{'─' * 60}\n")
-
-        script_path = os.path.join(base_dir, script)
+    def run(script):
         start = time.time()
-
         result = subprocess.run(
-            [sys.executable, script_path],
+            [sys.executable, os.path.join(base_dir, script)],
             cwd=base_dir,
+            capture_output=True,
+            text=True,
         )
-
-        elapsed = time.time() - start
-        status = "OK" if result.returncode == 0 else f"FAILED (exit {result.returncode})"
-        print(f"\n  [{status}] {name} ({elapsed:.0f}s)")
+        return result, time.time() - start
+
+    with ThreadPoolExecutor(max_workers=len(SCRIPTS)) as pool:
+        futures = {pool.submit(run, script): (name, script) for name, script in SCRIPTS}
+        for future in as_completed(futures):
+            name, script = futures[future]
+            result, elapsed = future.result()
+
+            print(f"\n{'─' * 60}")
+            print(f"▶ {name} ({script})")
+            print(f"{'─' * 60}\n")
+            print(result.stdout, end="")
+            if result.stderr:
+                print(result.stderr, end="", file=sys.stderr)
+
+            status = "OK" if result.returncode == 0 else f"FAILED (exit {result.returncode})"
+            print(f"\n  [{status}] {name} ({elapsed:.0f}s)", flush=True)
 
     print(f"\n{'=' * 60}")
     print("ALL FETCHERS COMPLETE")
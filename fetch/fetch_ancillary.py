@@ -12,12 +12,15 @@ Outputs:
   data/raw/dc_masterdata.csv         - Dynamic Containment results
   data/raw/eac_results_summary.csv   - EAC auction results
   data/processed/ancillary_daily_prices.csv - cleaned daily clearing prices
+  (with a .parquet copy alongside for faster reloads)
 """
 
-import requests
 import pandas as pd
 import os
 
+from _http import SESSION, conditional_download
+from _storage import save_table
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
@@ -33,40 +36,43 @@ DC_MASTERDATA_URL = (
 EAC_DATASET_URL = "https://api.neso.energy/api/3/action/datapackage_show?id=eac-auction-results"
 
 
-def fetch_dc_data():
-    """Download Dynamic Containment masterdata CSV."""
-    path = os.path.join(RAW_DIR, "dc_masterdata.csv")
+def read_raw_csv(path):
+    """Load a downloaded CSV with the multithreaded pyarrow parser."""
+    return pd.read_csv(path, engine="pyarrow")
+
 
+def read_existing(path, label):
+    """Fall back to a previously downloaded copy after a failed refresh."""
     if os.path.exists(path):
-        print(f"DC masterdata already exists: {path}")
-        return pd.read_csv(path)
+        print(f"Using existing {label}: {path}")
+        return read_raw_csv(path)
+    return pd.DataFrame()
+
+
+def fetch_dc_data():
+    """Download Dynamic Containment masterdata CSV (revalidated if already present)."""
+    path = os.path.join(RAW_DIR, "dc_masterdata.csv")
 
     print(f"Downloading DC masterdata...")
     try:
-        resp = requests.get(DC_MASTERDATA_URL, timeout=120)
-        resp.raise_for_status()
-
-        with open(path, "wb") as f:
-            f.write(resp.content)
-        print(f"Saved: {path} ({len(resp.content) / 1024:.0f} KB)")
+        if conditional_download(DC_MASTERDATA_URL, path, timeout=120):
+            print(f"Saved: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        else:
+            print(f"DC masterdata unchanged on server: {path}")
 
-        return pd.read_csv(path)
+        return read_raw_csv(path)
     except Exception as e:
         print(f"Failed to download DC data: {e}")
-        return pd.DataFrame()
+        return read_existing(path, "DC masterdata")
 
 
 def fetch_eac_data():
-    """Download EAC auction results summary CSV."""
+    """Download EAC auction results summary CSV (revalidated if already present)."""
     path = os.path.join(RAW_DIR, "eac_results_summary.csv")
 
-    if os.path.exists(path):
-        print(f"EAC results already exist: {path}")
-        return pd.read_csv(path)
-
     print("Fetching EAC dataset metadata to find download URLs...")
     try:
-        resp = requests.get(EAC_DATASET_URL, timeout=30)
+        resp = SESSION.get(EAC_DATASET_URL, timeout=30)
         resp.raise_for_status()
         metadata = resp.json()
 
@@ -87,26 +93,24 @@ def fetch_eac_data():
             download_url = f"https://api.neso.energy/datastore/dump/{resource_id}?format=csv"
             print(f"Downloading EAC results: {summary_resource.get('name', 'unknown')}")
 
-            resp = requests.get(download_url, timeout=120)
-            resp.raise_for_status()
+            if conditional_download(download_url, path, timeout=120):
+                print(f"Saved: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+            else:
+                print(f"EAC results unchanged on server: {path}")
 
-            with open(path, "wb") as f:
-                f.write(resp.content)
-            print(f"Saved: {path} ({len(resp.content) / 1024:.0f} KB)")
-
-            return pd.read_csv(path)
+            return read_raw_csv(path)
         else:
             print("WARNING: No EAC results resource found")
-            return pd.DataFrame()
+            return read_existing(path, "EAC results")
 
     except Exception as e:
         print(f"Failed to download EAC data: {e}")
-        return pd.DataFrame()
+        return read_existing(path, "EAC results")
 
 
 def process_ancillary(dc_df, eac_df):
     """Process ancillary data into daily clearing prices."""
-    rows = []
+    pieces = []
 
     # Process DC data
     # Columns: Market Name, Delivery Date, Availability Fee, Volume Accepted, etc.
@@ -114,18 +118,30 @@ def process_ancillary(dc_df, eac_df):
         print(f"\nDC data: {len(dc_df)} rows")
 
         # Only accepted bids
-        accepted = dc_df[dc_df["Accepted/Rejected"] == "Accepted"].copy()
-        accepted["Delivery Date"] = pd.to_datetime(accepted["Delivery Date"], errors="coerce")
+        accepted = dc_df.query("`Accepted/Rejected` == 'Accepted'").copy()
+        # ISO 8601 covers both date-only and timestamped exports; the parse
+        # stays on the fast path without a per-value format guess. Parsed as
+        # UTC and made naive, so exports with and without an offset give the
+        # same naive day keys as the EAC rows
+        accepted["Delivery Date"] = pd.to_datetime(
+            accepted["Delivery Date"], format="ISO8601", errors="coerce", utc=True,
+            cache=True).dt.tz_convert(None)
         accepted["Availability Fee"] = pd.to_numeric(accepted["Availability Fee"], errors="coerce")
-
-        for market, mdf in accepted.groupby("Market Name"):
-            daily = mdf.groupby(mdf["Delivery Date"].dt.date)["Availability Fee"].mean()
-            for date, price in daily.items():
-                rows.append({
-                    "date": date,
-                    "service": market,
-                    "clearing_price_mw_h": price,
-                })
+        # A handful of market names repeated across every bid: store as codes
+        accepted["Market Name"] = accepted["Market Name"].astype("category")
+
+        # Sorting once by the group keys lets the groupby walk contiguous runs
+        # in first-seen order (sort=False) instead of sorting the groups again.
+        # Daily mean per market in one grouped pass, already in the target layout
+        accepted = accepted.sort_values(["Market Name", "Delivery Date"], kind="stable")
+        daily = (accepted
+                 .groupby(["Market Name", accepted["Delivery Date"].dt.floor("D")],
+                          sort=False, observed=True)
+                 ["Availability Fee"].mean()
+                 .rename("clearing_price_mw_h")
+                 .reset_index()
+                 .rename(columns={"Market Name": "service", "Delivery Date": "date"}))
+        pieces.append(daily[["date", "service", "clearing_price_mw_h"]])
         print(f"  Processed {len(accepted)} accepted DC bids across "
               f"{accepted['Market Name'].nunique()} markets")
 
@@ -135,30 +151,37 @@ def process_ancillary(dc_df, eac_df):
         print(f"\nEAC data: {len(eac_df)} rows")
 
         eac_df = eac_df.copy()
-        eac_df["deliveryStart"] = pd.to_datetime(eac_df["deliveryStart"], errors="coerce")
+        # deliveryStart usually carries an offset ("...Z"); UTC then naive, as
+        # for DC, so the two pieces concatenate and sort as one date column
+        eac_df["deliveryStart"] = pd.to_datetime(
+            eac_df["deliveryStart"], format="ISO8601", errors="coerce", utc=True,
+            cache=True).dt.tz_convert(None)
         eac_df["clearingPrice"] = pd.to_numeric(eac_df["clearingPrice"], errors="coerce")
 
         # Only rows with positive executed quantity
-        active = eac_df[eac_df["executedQuantity"] > 0].copy()
-
-        for service, sdf in active.groupby("serviceType"):
-            daily = sdf.groupby(sdf["deliveryStart"].dt.date)["clearingPrice"].mean()
-            for date, price in daily.items():
-                rows.append({
-                    "date": date,
-                    "service": f"EAC_{service}",
-                    "clearing_price_mw_h": price,
-                })
+        active = eac_df.query("executedQuantity > 0").copy()
+        # Few service types repeated across every result, as for DC markets
+        active["serviceType"] = active["serviceType"].astype("category")
+
+        active = active.sort_values(["serviceType", "deliveryStart"], kind="stable")
+        daily = (active
+                 .groupby(["serviceType", active["deliveryStart"].dt.floor("D")],
+                          sort=False, observed=True)
+                 ["clearingPrice"].mean()
+                 .rename("clearing_price_mw_h")
+                 .reset_index()
+                 .rename(columns={"serviceType": "service", "deliveryStart": "date"}))
+        daily["service"] = "EAC_" + daily["service"].astype(str)
+        pieces.append(daily[["date", "service", "clearing_price_mw_h"]])
         print(f"  Processed {len(active)} active EAC results across "
               f"{active['serviceType'].nunique()} service types")
 
-    if rows:
-        result = pd.DataFrame(rows)
-        result["date"] = pd.to_datetime(result["date"])
+    if any(len(piece) for piece in pieces):
+        result = pd.concat(pieces, ignore_index=True)
         result = result.sort_values("date")
 
         path = os.path.join(PROCESSED_DIR, "ancillary_daily_prices.csv")
-        result.to_csv(path, index=False)
+        save_table(result, path)
         print(f"\nSaved processed ancillary prices: {path} ({len(result)} rows)")
         return result
 
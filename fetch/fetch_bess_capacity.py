@@ -11,12 +11,16 @@ but fall back to hardcoded data points from public sources if that fails.
 
 Outputs:
   data/processed/bess_capacity_monthly.csv - historic + projected BESS capacity (GW)
+  data/processed/bess_fes_scenarios.csv  - monthly capacity under each FES scenario
+  (each with a .parquet copy alongside for faster reloads)
 """
 
 import pandas as pd
 import numpy as np
 import os
-import requests
+
+from _http import conditional_download
+from _storage import save_table
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
@@ -68,86 +72,59 @@ FES_SCENARIOS = ["leading_the_way", "consumer_transformation",
 
 
 def try_download_fes_workbook():
-    """Try to download the FES 2024 Data Workbook. Returns path or None."""
+    """Try to download (or revalidate) the FES 2024 Data Workbook. Returns path or None."""
     url = "https://www.neso.energy/document/321051/download"
     path = os.path.join(RAW_DIR, "fes_2024_data_workbook.xlsx")
 
-    if os.path.exists(path):
-        print(f"FES workbook already downloaded: {path}")
-        return path
-
     print(f"Attempting to download FES workbook from {url}...")
     try:
-        resp = requests.get(url, timeout=120, allow_redirects=True)
-        if resp.status_code == 200 and len(resp.content) > 100000:
-            with open(path, "wb") as f:
-                f.write(resp.content)
-            print(f"Downloaded FES workbook: {path} ({len(resp.content) / 1e6:.1f} MB)")
-            return path
+        if conditional_download(url, path, timeout=120, min_bytes=100000):
+            print(f"Downloaded FES workbook: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
         else:
-            print(f"Download returned status {resp.status_code}, size {len(resp.content)}")
-            return None
+            print(f"FES workbook unchanged on server: {path}")
+        return path
     except Exception as e:
         print(f"Failed to download FES workbook: {e}")
+        if os.path.exists(path):
+            print(f"Using existing FES workbook: {path}")
+            return path
         return None
 
 
 def build_historic_monthly():
     """Interpolate known data points to monthly granularity."""
-    dates = []
-    values = []
-    for date_str, gw in sorted(KNOWN_CAPACITY_GW.items()):
-        dates.append(pd.Timestamp(date_str + "-01"))
-        values.append(gw)
-
-    df = pd.DataFrame({"date": dates, "bess_capacity_gw": values})
-    df = df.set_index("date")
-
-    # Resample to monthly and interpolate
-    monthly = df.resample("MS").interpolate(method="linear")
-
-    # Fill any leading/trailing gaps
-    full_range = pd.date_range(
-        start=df.index.min(),
-        end=df.index.max(),
-        freq="MS"
-    )
-    monthly = monthly.reindex(full_range).interpolate(method="linear")
-    monthly.index.name = "date"
+    known = sorted(KNOWN_CAPACITY_GW.items())
+    dates = pd.to_datetime([date_str + "-01" for date_str, _ in known], format="%Y-%m-%d")
+    values = np.array([gw for _, gw in known])
+
+    full_range = pd.date_range(start=dates.min(), end=dates.max(), freq="MS")
 
-    return monthly.reset_index()
+    # Interpolate on month counts rather than timestamps, so every month is an
+    # equal step whatever its length
+    known_months = dates.year * 12 + dates.month
+    target_months = full_range.year * 12 + full_range.month
+    return pd.DataFrame({
+        "date": full_range,
+        "bess_capacity_gw": np.interp(target_months, known_months, values),
+    })
 
 
 def build_fes_projections():
     """Build monthly projections from FES annual scenarios."""
-    rows = []
-    for year, values in sorted(FES_PROJECTIONS.items()):
-        for i, scenario in enumerate(FES_SCENARIOS):
-            rows.append({
-                "date": pd.Timestamp(f"{year}-01-01"),
-                "scenario": scenario,
-                "bess_capacity_gw": values[i],
-            })
-
-    df = pd.DataFrame(rows)
-
-    # Interpolate each scenario to monthly
-    monthly_dfs = []
-    for scenario in FES_SCENARIOS:
-        sdf = df[df["scenario"] == scenario][["date", "bess_capacity_gw"]].copy()
-        sdf = sdf.set_index("date")
-        full_range = pd.date_range(
-            start=sdf.index.min(),
-            end=sdf.index.max(),
-            freq="MS"
-        )
-        sdf = sdf.reindex(full_range).interpolate(method="linear")
-        sdf.index.name = "date"
-        sdf = sdf.reset_index()
-        sdf["scenario"] = scenario
-        monthly_dfs.append(sdf)
-
-    return pd.concat(monthly_dfs, ignore_index=True)
+    # One column per scenario, one row per year
+    wide = pd.DataFrame.from_dict(FES_PROJECTIONS, orient="index", columns=FES_SCENARIOS)
+    wide = wide.sort_index()
+    wide.index = pd.to_datetime(wide.index.astype(str) + "-01-01", format="%Y-%m-%d")
+
+    # Interpolate all scenarios to monthly in one pass
+    full_range = pd.date_range(start=wide.index.min(), end=wide.index.max(), freq="MS")
+    monthly = wide.reindex(full_range).interpolate(method="linear")
+    monthly.index.name = "date"
+
+    # Back to long format, scenario by scenario
+    long = monthly.reset_index().melt(
+        id_vars="date", var_name="scenario", value_name="bess_capacity_gw")
+    return long[["date", "bess_capacity_gw", "scenario"]]
 
 
 def main():
@@ -192,12 +169,12 @@ def main():
 
     # Save
     combined_path = os.path.join(PROCESSED_DIR, "bess_capacity_monthly.csv")
-    combined.to_csv(combined_path, index=False)
+    save_table(combined, combined_path)
     print(f"\nSaved combined series: {combined_path} ({len(combined)} rows)")
 
     # Also save all scenarios for sensitivity analysis
     projections_path = os.path.join(PROCESSED_DIR, "bess_fes_scenarios.csv")
-    projections.to_csv(projections_path, index=False)
+    save_table(projections, projections_path)
     print(f"Saved all FES scenarios: {projections_path}")
 
     print(f"\n{'=' * 60}")
@@ -8,30 +8,88 @@ Uses the Elexon Insights Solution API (free, no auth needed).
 Note: Solar doesn't appear in FUELHH — it's embedded generation in GB
 and counted as negative demand rather than positive generation.
 
+Responses for windows that ended more than CACHE_SETTLE_DAYS ago are kept
+gzipped under data/raw/elexon_cache/ and reused on later runs, so a refresh
+only downloads the recent weeks. Pass --no-cache to refetch everything and
+rewrite the cache.
+
 Outputs:
   data/raw/elexon_generation.csv      - daily wind generation
   data/raw/elexon_market_index.csv    - half-hourly market index prices
   data/processed/daily_wind_solar_generation.csv
   data/processed/daily_elexon_wholesale.csv
+  (processed files each with a .parquet copy alongside for faster reloads)
 """
 
-import requests
 import pandas as pd
-import time
+import argparse
+import functools
+import gzip
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+from _http import SESSION, TokenBucket, cache_disabled, parse_json
+from _storage import save_table
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+CACHE_DIR = os.path.join(RAW_DIR, "elexon_cache")
 
 ELEXON_BASE = "https://data.elexon.co.uk/bmrs/api/v1"
 
 START_DATE = "2019-01-01"
 CHUNK_DAYS = 7  # API max for both endpoints
 
-
-def fetch_fuelhh_range(from_date, to_date):
+# Timestamp layout of market index startTime ("2024-01-01T00:30:00Z")
+ELEXON_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Chunks are fetched concurrently over the session's connection pool; the
+# shared bucket caps the combined request rate to stay polite to the API.
+# A one-second burst lets the first wave of workers start together instead
+# of queueing behind a single token; cached windows never take a token
+MAX_WORKERS = 8
+RATE_LIMIT = TokenBucket(rate=5, capacity=5)
+
+# Windows ending this many days before today are treated as final and cached
+CACHE_SETTLE_DAYS = 2
+
+
+def get_chunk(name, url, params, from_date, to_date, use_cache=True):
+    """
+    GET one window's "data" records, via the on-disk cache for settled windows.
+
+    Raw response bytes are cached (gzip) only after a 200 with a non-empty
+    "data" list, keyed on endpoint name and window, and only once the window
+    is older than CACHE_SETTLE_DAYS. With use_cache=False the cache is not
+    read, but a good response still overwrites the entry, so a refetch also
+    repairs it.
+    """
+    cache_path = os.path.join(CACHE_DIR, f"{name}_{from_date}_{to_date}.json.gz")
+    settled = (datetime.now() - timedelta(days=CACHE_SETTLE_DAYS)).strftime("%Y-%m-%d")
+    cacheable = to_date < settled
+
+    if use_cache and cacheable and os.path.exists(cache_path):
+        with gzip.open(cache_path, "rb") as f:
+            return parse_json(f.read()).get("data", [])
+
+    RATE_LIMIT.acquire()
+    resp = SESSION.get(url, params=params, timeout=60)
+    if resp.status_code != 200:
+        return []
+    data = parse_json(resp.content).get("data", [])
+    if cacheable and data:
+        # Written under a temporary name so an interrupted run never leaves a
+        # truncated entry behind
+        tmp_path = cache_path + ".part"
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(resp.content)
+        os.replace(tmp_path, cache_path)
+    return data
+
+
+def fetch_fuelhh_range(from_date, to_date, use_cache=True):
     """Fetch FUELHH data for a date range (max 7 days)."""
     url = f"{ELEXON_BASE}/datasets/FUELHH"
     params = {
@@ -40,16 +98,13 @@ def fetch_fuelhh_range(from_date, to_date):
         "format": "json",
     }
     try:
-        resp = requests.get(url, params=params, timeout=60)
-        if resp.status_code != 200:
-            return []
-        return resp.json().get("data", [])
+        return get_chunk("fuelhh", url, params, from_date, to_date, use_cache)
     except Exception as e:
         print(f"  ERROR: {e}")
         return []
 
 
-def fetch_market_index_range(from_date, to_date):
+def fetch_market_index_range(from_date, to_date, use_cache=True):
     """Fetch market index data for a date range (max 7 days)."""
     url = f"{ELEXON_BASE}/balancing/pricing/market-index"
     params = {
@@ -58,117 +113,134 @@ def fetch_market_index_range(from_date, to_date):
         "format": "json",
     }
     try:
-        resp = requests.get(url, params=params, timeout=60)
-        if resp.status_code != 200:
-            return []
-        return resp.json().get("data", [])
+        return get_chunk("market_index", url, params, from_date, to_date, use_cache)
     except Exception as e:
         print(f"  ERROR: {e}")
         return []
 
 
-def fetch_all_generation(start_date, end_date):
-    """Fetch wind generation in 7-day chunks."""
-    all_rows = []
+def date_windows(start_date, end_date):
+    """Yield (from, to) date strings covering start..end in CHUNK_DAYS windows."""
     current = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
-
-    total_chunks = ((end - current).days // CHUNK_DAYS) + 1
-    chunk_num = 0
-
     while current <= end:
         chunk_end = min(current + timedelta(days=CHUNK_DAYS - 1), end)
-        from_str = current.strftime("%Y-%m-%d")
-        to_str = chunk_end.strftime("%Y-%m-%d")
-
-        records = fetch_fuelhh_range(from_str, to_str)
-
-        if records:
-            # Group by settlement date and compute daily wind generation
-            by_date = {}
-            for r in records:
-                d = r.get("settlementDate", "")
-                ft = r.get("fuelType", "")
-                gen = r.get("generation", 0)
-                if d not in by_date:
-                    by_date[d] = {"wind": [], "total_records": 0}
-                by_date[d]["total_records"] += 1
-                if ft == "WIND":
-                    by_date[d]["wind"].append(gen)
-
-            for d, vals in by_date.items():
-                wind_gens = vals["wind"]
-                all_rows.append({
-                    "date": d,
-                    "wind_gen_mw": sum(wind_gens) / len(wind_gens) if wind_gens else 0,
-                    "solar_gen_mw": 0,
-                    "wind_periods": len(wind_gens),
-                    "solar_periods": 0,
-                })
-
-        chunk_num += 1
-        if chunk_num % 20 == 0:
-            print(f"  Generation: chunk {chunk_num}/{total_chunks} "
-                  f"({from_str} to {to_str}), {len(all_rows)} days so far")
-
+        yield current.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")
         current = chunk_end + timedelta(days=1)
-        time.sleep(0.3)
 
-    return pd.DataFrame(all_rows)
 
-
-def fetch_all_market_index(start_date, end_date):
+def fetch_chunks(fetch_range, windows):
+    """
+    Call fetch_range(from, to) for every window concurrently.
+
+    Yields (index, from, to, result) as chunks finish; callers slot results
+    back by index so the output keeps chronological order.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {pool.submit(fetch_range, f, t): (i, f, t)
+                   for i, (f, t) in enumerate(windows)}
+        for future in as_completed(futures):
+            i, f, t = futures[future]
+            yield i, f, t, future.result()
+
+
+def daily_wind(records):
+    """Daily mean WIND generation (MW) and period count from FUELHH records."""
+    chunk_df = pd.DataFrame.from_records(
+        records, columns=["settlementDate", "fuelType", "generation"])
+    # Non-wind rows become NaN so they drop out of the mean and count but
+    # still give their date a row (0 MW, 0 periods) as before
+    is_wind = chunk_df["fuelType"].to_numpy() == "WIND"
+    wind = chunk_df["generation"].fillna(0).where(is_wind)
+    daily = wind.groupby(chunk_df["settlementDate"].fillna(""), sort=False).agg(["mean", "count"])
+    return pd.DataFrame({
+        "date": daily.index,
+        "wind_gen_mw": daily["mean"].fillna(0).to_numpy(),
+        "solar_gen_mw": 0,
+        "wind_periods": daily["count"].to_numpy(),
+        "solar_periods": 0,
+    })
+
+
+def fetch_all_generation(start_date, end_date, use_cache=True):
+    """Fetch wind generation in 7-day chunks."""
+    windows = list(date_windows(start_date, end_date))
+    total_chunks = len(windows)
+    chunk_dfs = [None] * total_chunks
+    n_days = 0
+
+    # --no-cache bypasses the HTTP cache as well; switched once around the
+    # whole batch because requests-cache's switch is not thread-safe
+    with cache_disabled(not use_cache):
+        for chunk_num, (i, from_str, to_str, records) in enumerate(
+                fetch_chunks(functools.partial(fetch_fuelhh_range, use_cache=use_cache), windows),
+                start=1):
+            if records:
+                chunk_dfs[i] = daily_wind(records)
+                n_days += len(chunk_dfs[i])
+
+            if chunk_num % 20 == 0:
+                print(f"  Generation: chunk {chunk_num}/{total_chunks} "
+                      f"({from_str} to {to_str}), {n_days} days so far")
+
+    # One concat in window order; chunks that returned nothing are skipped
+    chunk_dfs = [df for df in chunk_dfs if df is not None]
+    return pd.concat(chunk_dfs, ignore_index=True) if chunk_dfs else pd.DataFrame()
+
+
+def fetch_all_market_index(start_date, end_date, use_cache=True):
     """Fetch wholesale market index in 7-day chunks."""
-    all_data = []
-    current = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    windows = list(date_windows(start_date, end_date))
+    total_chunks = len(windows)
+    chunk_dfs = [None] * total_chunks
+    n_records = 0
 
-    total_chunks = ((end - current).days // CHUNK_DAYS) + 1
-    chunk_num = 0
+    with cache_disabled(not use_cache):
+        for chunk_num, (i, from_str, to_str, data) in enumerate(
+                fetch_chunks(functools.partial(fetch_market_index_range, use_cache=use_cache),
+                             windows),
+                start=1):
+            if data:
+                chunk_dfs[i] = pd.DataFrame.from_records(data)
+                n_records += len(data)
 
-    while current <= end:
-        chunk_end = min(current + timedelta(days=CHUNK_DAYS - 1), end)
-        from_str = current.strftime("%Y-%m-%d")
-        to_str = chunk_end.strftime("%Y-%m-%d")
+            if chunk_num % 20 == 0:
+                print(f"  Market index: chunk {chunk_num}/{total_chunks} "
+                      f"({from_str} to {to_str}), {n_records} records so far")
 
-        data = fetch_market_index_range(from_str, to_str)
-        all_data.extend(data)
-
-        chunk_num += 1
-        if chunk_num % 20 == 0:
-            print(f"  Market index: chunk {chunk_num}/{total_chunks} "
-                  f"({from_str} to {to_str}), {len(all_data)} records so far")
-
-        current = chunk_end + timedelta(days=1)
-        time.sleep(0.3)
-
-    return all_data
+    # As for generation: one concat in window order, skipping empty chunks
+    chunk_dfs = [df for df in chunk_dfs if df is not None]
+    return pd.concat(chunk_dfs, ignore_index=True) if chunk_dfs else pd.DataFrame()
 
 
 def process_generation(df):
     """Convert generation to daily averages in GW, save processed file."""
     df = df.copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").drop_duplicates(subset=["date"], keep="last")
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", cache=True)
+    # Last row per date from a grouped reduction rather than hashing whole rows
+    df = df.sort_values("date").groupby("date", as_index=False, sort=False).last()
     df["wind_gen_gw"] = df["wind_gen_mw"] / 1000
     df["solar_gen_gw"] = df["solar_gen_mw"] / 1000
 
     out = df[["date", "wind_gen_gw", "solar_gen_gw", "wind_gen_mw", "solar_gen_mw"]].copy()
     path = os.path.join(PROCESSED_DIR, "daily_wind_solar_generation.csv")
-    out.to_csv(path, index=False)
+    save_table(out, path)
     print(f"Saved processed generation: {path} ({len(out)} rows)")
     return out
 
 
-def process_market_index(data):
+def process_market_index(df):
     """Process market index data into daily wholesale prices."""
-    if not data:
+    if df.empty:
         print("WARNING: No market index data")
         return pd.DataFrame()
 
-    df = pd.DataFrame(data)
-    df["startTime"] = pd.to_datetime(df["startTime"], utc=True)
-    df["date"] = df["startTime"].dt.date
+    df = df.copy()
+    df["startTime"] = pd.to_datetime(
+        df["startTime"], format=ELEXON_TIME_FORMAT, utc=True, cache=True)
+    # UTC calendar day as datetime64 rather than Python date objects, so the
+    # daily groupby hashes integers
+    df["date"] = df["startTime"].values.astype("datetime64[D]")
 
     # Use APXMIDP as primary provider
     apx = df[df["dataProvider"] == "APXMIDP"].copy()
@@ -181,25 +253,27 @@ def process_market_index(data):
         wholesale_mean=("price", "mean"),
         wholesale_max=("price", "max"),
         wholesale_min=("price", "min"),
-        wholesale_spread=("price", lambda x: x.max() - x.min()),
         n_periods=("price", "count"),
-    ).reset_index()
-    daily["date"] = pd.to_datetime(daily["date"])
+    )
+    # Spread from the reduced columns instead of a per-group lambda
+    daily.insert(3, "wholesale_spread", daily["wholesale_max"] - daily["wholesale_min"])
+    daily = daily.reset_index()
 
     raw_path = os.path.join(RAW_DIR, "elexon_market_index.csv")
     apx.to_csv(raw_path, index=False)
     print(f"Saved raw market index: {raw_path} ({len(apx)} rows)")
 
     processed_path = os.path.join(PROCESSED_DIR, "daily_elexon_wholesale.csv")
-    daily.to_csv(processed_path, index=False)
+    save_table(daily, processed_path)
     print(f"Saved daily wholesale prices: {processed_path} ({len(daily)} rows)")
 
     return daily
 
 
-def main():
+def main(use_cache=True):
     os.makedirs(RAW_DIR, exist_ok=True)
     os.makedirs(PROCESSED_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
 
     end_date = datetime.now().strftime("%Y-%m-%d")
 
@@ -212,7 +286,7 @@ def main():
     print("Fetching in 7-day chunks (API limit)...")
     print("Note: Solar not in FUELHH (embedded generation in GB)\n")
 
-    gen_df = fetch_all_generation(START_DATE, end_date)
+    gen_df = fetch_all_generation(START_DATE, end_date, use_cache)
     if not gen_df.empty:
         # Save raw
         raw_path = os.path.join(RAW_DIR, "elexon_generation.csv")
@@ -229,9 +303,9 @@ def main():
     print(f"\n--- Market index wholesale prices ({START_DATE} to {end_date}) ---")
     print("Fetching in 7-day chunks...\n")
 
-    market_data = fetch_all_market_index(START_DATE, end_date)
-    if market_data:
-        wholesale_daily = process_market_index(market_data)
+    market_df = fetch_all_market_index(START_DATE, end_date, use_cache)
+    if not market_df.empty:
+        wholesale_daily = process_market_index(market_df)
         if not wholesale_daily.empty:
             print(f"\nWholesale summary:")
             print(f"  Date range: {wholesale_daily['date'].min().date()} to {wholesale_daily['date'].max().date()}")
@@ -244,4 +318,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch Elexon generation and market index data")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="refetch every window, rewriting cached chunk responses")
+    main(use_cache=not parser.parse_args().no_cache)
@@ -8,19 +8,42 @@ This gives us the total installed base of wind and solar over time, which we nee
 to control for when estimating the BESS → spread relationship (more renewables also
 affects spread, independent of storage).
 
+The series itself comes from curated quarterly points; pass --validate-excel
+to also parse the downloaded workbook and confirm it still carries the table.
+
 Outputs:
   data/raw/energy_trends_6_1.xlsx
   data/processed/renewable_capacity_monthly.csv
+  (with a .parquet copy alongside for faster reloads)
 """
 
-import requests
 import pandas as pd
+import numpy as np
+import argparse
+import contextlib
+import hashlib
 import os
+import re
+
+from _http import conditional_download
+from _storage import save_table, sidecar_path
+
+# The Rust-based calamine reader parses xlsx far faster than openpyxl. Without
+# it the workbook is read through openpyxl's read-only streaming mode
+try:
+    import python_calamine  # noqa: F401  (used through pd.ExcelFile's engine)
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 
+# Set once the output directories are known to exist, so repeated main()
+# calls from an orchestrating process skip the makedirs calls
+_DIRS_READY = False
+
 # DESNZ Energy Trends Table 6.1 download URL
 # This URL may change with each quarterly release — update as needed
 ENERGY_TRENDS_URL = (
@@ -30,7 +53,8 @@ ENERGY_TRENDS_URL = (
 
 # Fallback: known UK renewable capacity data points (GW) if Excel parsing fails
 # Sources: DESNZ Energy Trends, BEIS statistics
-KNOWN_CAPACITY = [
+# Held as one float64 array so build_from_known_data slices columns directly
+KNOWN_CAPACITY = np.array([
     # (year, quarter, onshore_wind_gw, offshore_wind_gw, solar_gw)
     (2019, 1, 13.6, 8.5, 13.1),
     (2019, 2, 13.7, 9.1, 13.3),
@@ -60,49 +84,89 @@ KNOWN_CAPACITY = [
     (2025, 2, 15.7, 16.3, 18.6),
     (2025, 3, 15.8, 16.8, 19.0),
     (2025, 4, 15.9, 17.2, 19.4),
-]
+], dtype=np.float64)
 
 
-def try_download_energy_trends():
-    """Try to download Energy Trends Table 6.1 Excel file."""
-    path = os.path.join(RAW_DIR, "energy_trends_6_1.xlsx")
-
-    if os.path.exists(path):
-        print(f"Energy Trends file already exists: {path}")
-        return path
+def try_download_energy_trends(url=ENERGY_TRENDS_URL, path=None):
+    """Try to download (or revalidate) Energy Trends Table 6.1 Excel file. Returns path or None."""
+    if path is None:
+        path = os.path.join(RAW_DIR, "energy_trends_6_1.xlsx")
 
     print(f"Downloading Energy Trends Table 6.1...")
     try:
-        resp = requests.get(ENERGY_TRENDS_URL, timeout=60, allow_redirects=True)
-        if resp.status_code == 200 and len(resp.content) > 10000:
-            with open(path, "wb") as f:
-                f.write(resp.content)
-            print(f"Saved: {path} ({len(resp.content) / 1024:.0f} KB)")
-            return path
+        # Streamed to disk rather than held in memory; anything under 10 KB
+        # is an error page rather than the workbook. An existing copy is
+        # revalidated with its stored ETag / Last-Modified
+        if conditional_download(url, path, timeout=(5, 60), min_bytes=10000):
+            print(f"Saved: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
         else:
-            print(f"Download returned status {resp.status_code}")
-            return None
+            print(f"Energy Trends file unchanged on server: {path}")
+        return path
     except Exception as e:
         print(f"Failed to download: {e}")
+        if os.path.exists(path):
+            print(f"Using existing Energy Trends file: {path}")
+            return path
         return None
 
 
+# DESNZ tables put their titles and column headings at the top of the sheet
+HEADER_ROWS = 50
+CAPACITY_RE = re.compile(r"capacity", re.IGNORECASE)
+WIND_SOLAR_RE = re.compile(r"wind|solar", re.IGNORECASE)
+
+
+def sheet_mentions_capacity(df):
+    """True if the sheet's header rows mention capacity and wind or solar."""
+    cells = df.head(HEADER_ROWS).to_numpy(dtype=object).ravel()
+    # One string of the non-empty cells, searched case-insensitively as is
+    # rather than through a lowercased copy
+    text = "\n".join(str(cell) for cell in cells if pd.notna(cell))
+    return bool(CAPACITY_RE.search(text) and WIND_SOLAR_RE.search(text))
+
+
+@contextlib.contextmanager
+def open_workbook(path):
+    """
+    Open the workbook once, yielding its sheet names and a sheet reader.
+
+    The reader returns a sheet as a headerless DataFrame of raw cell values.
+    """
+    if EXCEL_ENGINE == "calamine":
+        with pd.ExcelFile(path, engine="calamine") as xl:
+            yield xl.sheet_names, lambda sheet: xl.parse(sheet, header=None)
+        return
+
+    # openpyxl's default mode builds every cell object of the whole workbook;
+    # read-only mode streams rows from the sheet XML on demand
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield wb.sheetnames, lambda sheet: pd.DataFrame(wb[sheet].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
 def parse_energy_trends_excel(path):
     """Try to parse the Energy Trends Excel file for capacity data."""
     try:
         # The structure of this file varies — try common patterns
-        xl = pd.ExcelFile(path)
-        print(f"Sheets: {xl.sheet_names}")
-
-        # Look for a sheet with capacity data
-        for sheet in xl.sheet_names:
-            df = pd.read_excel(path, sheet_name=sheet, header=None)
-            # Check if this sheet has what we need
-            text = df.to_string().lower()
-            if "capacity" in text and ("wind" in text or "solar" in text):
-                print(f"Found capacity data in sheet: {sheet}")
-                # This is complex to parse generically — return for manual inspection
-                return df
+        with open_workbook(path) as (sheet_names, read_sheet):
+            print(f"Sheets: {sheet_names}")
+
+            # Look for a sheet with capacity data. Sheets named for the table
+            # ("6.1 ...") or for capacity are parsed first; the rest only if
+            # none of those match
+            candidates = [sheet for sheet in sheet_names
+                          if "6.1" in sheet or "capacity" in sheet.lower()]
+            others = [sheet for sheet in sheet_names if sheet not in candidates]
+            for sheet in candidates + others:
+                df = read_sheet(sheet)
+                # Check if this sheet has what we need
+                if sheet_mentions_capacity(df):
+                    print(f"Found capacity data in sheet: {sheet}")
+                    # This is complex to parse generically — return for manual inspection
+                    return df
 
         print("Could not find capacity data sheet — using fallback data")
         return None
@@ -113,72 +177,127 @@ def parse_energy_trends_excel(path):
 
 def build_from_known_data():
     """Build monthly capacity series from known quarterly data points."""
-    rows = []
-    for year, quarter, onshore, offshore, solar in KNOWN_CAPACITY:
-        # Map quarter to month (end of quarter)
-        month = quarter * 3
-        date = pd.Timestamp(year=year, month=month, day=1)
-        rows.append({
-            "date": date,
-            "onshore_wind_gw": onshore,
-            "offshore_wind_gw": offshore,
-            "solar_gw": solar,
-            "total_wind_gw": onshore + offshore,
-            "total_renewables_gw": onshore + offshore + solar,
-        })
-
-    df = pd.DataFrame(rows).set_index("date")
-
-    # Interpolate to monthly
-    full_range = pd.date_range(start=df.index.min(), end=df.index.max(), freq="MS")
-    df = df.reindex(full_range).interpolate(method="linear")
-    df.index.name = "date"
-
-    return df.reset_index()
-
-
-def main():
-    os.makedirs(RAW_DIR, exist_ok=True)
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    # One typed array per column rather than a dict and Timestamp per quarter
+    onshore, offshore, solar = KNOWN_CAPACITY[:, 2], KNOWN_CAPACITY[:, 3], KNOWN_CAPACITY[:, 4]
+    # Map quarter to month (end of quarter)
+    dates = pd.to_datetime({
+        "year": KNOWN_CAPACITY[:, 0].astype("i4"),
+        "month": KNOWN_CAPACITY[:, 1].astype("i4") * 3,
+        "day": 1,
+    })
+
+    quarterly = {
+        "onshore_wind_gw": onshore,
+        "offshore_wind_gw": offshore,
+        "solar_gw": solar,
+        "total_wind_gw": onshore + offshore,
+        "total_renewables_gw": onshore + offshore + solar,
+    }
+
+    # Interpolate to monthly with np.interp per column. The x axis counts
+    # months rather than nanoseconds, so every month is an equal step
+    # whatever its length. The result is built with `date` as a plain
+    # column, so there is no index to set and reset
+    full_range = pd.date_range(start=dates.min(), end=dates.max(), freq="MS")
+    known_months = dates.dt.year * 12 + dates.dt.month
+    target_months = full_range.year * 12 + full_range.month
+    return pd.DataFrame({
+        "date": full_range,
+        **{col: np.interp(target_months, known_months, values)
+           for col, values in quarterly.items()},
+    })
+
+
+def inputs_key():
+    """Hash of what the monthly series is built from: the curated points and this script."""
+    h = hashlib.blake2b(KNOWN_CAPACITY.tobytes(), digest_size=16)
+    with open(__file__, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def ensure_dirs():
+    global _DIRS_READY
+    if not _DIRS_READY:
+        os.makedirs(RAW_DIR, exist_ok=True)
+        os.makedirs(PROCESSED_DIR, exist_ok=True)
+        _DIRS_READY = True
+
+
+def main(validate_excel=False, executor=None):
+    """
+    Download the workbook and write the monthly series.
+
+    The series doesn't depend on the workbook, so when an orchestrator passes
+    its `executor` the download runs there, overlapping with the build below
+    (and with whatever else that executor is fetching).
+    """
+    ensure_dirs()
 
     print("=" * 60)
     print("FETCHING RENEWABLE CAPACITY DATA")
     print("=" * 60)
 
     # Try to download the official Excel file
-    excel_path = try_download_energy_trends()
-    if excel_path:
-        parsed = parse_energy_trends_excel(excel_path)
-        if parsed is not None:
-            print("(Excel parsed — but using curated data points for reliability)")
+    if executor is not None:
+        download = executor.submit(try_download_energy_trends)
+    else:
+        download = None
+        excel_path = try_download_energy_trends()
 
     # Build from known data points
     print("\n--- Building monthly capacity series ---")
     df = build_from_known_data()
 
     path = os.path.join(PROCESSED_DIR, "renewable_capacity_monthly.csv")
-    df.to_csv(path, index=False)
-    print(f"Saved: {path} ({len(df)} rows)")
+    # Leave the output untouched when its inputs are unchanged, so its mtime
+    # doesn't invalidate the Parquet and plot caches downstream
+    key_path = path + ".hash"
+    key = inputs_key()
+    stored = None
+    # Both the CSV and its Parquet copy must be present to count as current
+    if all(os.path.exists(p) for p in (path, sidecar_path(path), key_path)):
+        with open(key_path) as f:
+            stored = f.read().strip()
+    if stored == key:
+        print(f"Up to date: {path} ({len(df)} rows)")
+    else:
+        save_table(df, path)
+        with open(key_path, "w") as f:
+            f.write(key)
+        print(f"Saved: {path} ({len(df)} rows)")
+
+    if download is not None:
+        excel_path = download.result()
+    # The series is built from the curated points either way, so the
+    # workbook is only parsed when asked to check it still has Table 6.1
+    if excel_path and validate_excel:
+        parsed = parse_energy_trends_excel(excel_path)
+        if parsed is not None:
+            print("(Excel parsed — but using curated data points for reliability)")
 
     print(f"\n{'=' * 60}")
     print("RENEWABLE CAPACITY SUMMARY")
     print(f"{'=' * 60}")
     print(f"Date range: {df['date'].min().date()} to {df['date'].max().date()}")
+    # First and last rows as plain tuples in one pull
+    earliest, latest = df.iloc[[0, -1]].itertuples(index=False)
     print(f"\nLatest values:")
-    latest = df.iloc[-1]
-    print(f"  Onshore wind:  {latest['onshore_wind_gw']:.1f} GW")
-    print(f"  Offshore wind: {latest['offshore_wind_gw']:.1f} GW")
-    print(f"  Solar PV:      {latest['solar_gw']:.1f} GW")
-    print(f"  Total wind:    {latest['total_wind_gw']:.1f} GW")
-    print(f"  Total:         {latest['total_renewables_gw']:.1f} GW")
+    print(f"  Onshore wind:  {latest.onshore_wind_gw:.1f} GW")
+    print(f"  Offshore wind: {latest.offshore_wind_gw:.1f} GW")
+    print(f"  Solar PV:      {latest.solar_gw:.1f} GW")
+    print(f"  Total wind:    {latest.total_wind_gw:.1f} GW")
+    print(f"  Total:         {latest.total_renewables_gw:.1f} GW")
 
     print(f"\nGrowth since 2019:")
-    earliest = df.iloc[0]
-    print(f"  Wind: {earliest['total_wind_gw']:.1f} → {latest['total_wind_gw']:.1f} GW "
-          f"(+{latest['total_wind_gw'] - earliest['total_wind_gw']:.1f})")
-    print(f"  Solar: {earliest['solar_gw']:.1f} → {latest['solar_gw']:.1f} GW "
-          f"(+{latest['solar_gw'] - earliest['solar_gw']:.1f})")
+    print(f"  Wind: {earliest.total_wind_gw:.1f} → {latest.total_wind_gw:.1f} GW "
+          f"(+{latest.total_wind_gw - earliest.total_wind_gw:.1f})")
+    print(f"  Solar: {earliest.solar_gw:.1f} → {latest.solar_gw:.1f} GW "
+          f"(+{latest.solar_gw - earliest.solar_gw:.1f})")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch UK wind and solar capacity data")
+    parser.add_argument("--validate-excel", action="store_true",
+                        help="parse the downloaded workbook to check for the capacity sheet")
+    main(validate_excel=parser.parse_args().validate_excel)